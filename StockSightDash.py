@@ -1,22 +1,21 @@
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import logging
 import re
-import matplotlib.pyplot as plt 
 import streamlit as st
 import _datetime # type: ignore
-import plotly.express as px
-from urllib.request import urlopen, Request
-from bs4 import BeautifulSoup
-import seaborn as sns
-import nltk
-from nltk.data import find
-from nltk.downloader import Downloader
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import plotly.graph_objects as go
+from stocksight import charts, framecache, instrument, metadata, prices, sentiment, statements, tables
+from stocksight import news as finviz
+from stocksight.lazy import lazy_import
 
+#only needed by the "Further Sentiment Analysis" chart
+plt = lazy_import("matplotlib.pyplot")
 
 
+
+#pandas copy-on-write: shared cached frames are handed out as shallow copies (see stocksight/framecache.py)
+framecache.enable_copy_on_write()
+
 st.set_page_config(
     page_title="StockSight Dashboard",
     page_icon="📈"
@@ -24,6 +23,9 @@ st.set_page_config(
 )
 st.set_option('client.showErrorDetails', False)
 
+instrument.setup()
+instrument.begin_rerun("dashboard")
+
 main_bg= f"""
 <style>
 [data-testid="stAppViewContainer"] {{
@@ -50,13 +52,6 @@ st.sidebar.success("Select Page")
 
 st.title("StockSight Dashboard")
 
-def ensure_vader_lexicon():
-    try:
-        find('sentiment/vader_lexicon.zip')
-    except LookupError:
-        nltk.download('vader_lexicon')
-    
-ensure_vader_lexicon()
 
 
 main_ind = {"^GSPC": [],
@@ -64,12 +59,10 @@ main_ind = {"^GSPC": [],
             "NDAQ": [], 
             "^RUT": []
            }
+ind_fields = ['regularMarketOpen', 'regularMarketPreviousClose', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow']
+ind_info = metadata.default_service().get_many(main_ind.keys(), ind_fields)
 for ind in main_ind:
-    open_a = yf.Ticker(ind).info.get('regularMarketOpen')
-    prev_close = yf.Ticker(ind).info.get('regularMarketPreviousClose')
-    year_h=yf.Ticker(ind).info.get('fiftyTwoWeekHigh')
-    year_l=yf.Ticker(ind).info.get('fiftyTwoWeekLow')
-    main_ind[ind] += [open_a, prev_close, year_h, year_l]
+    main_ind[ind] += [ind_info[ind][field] for field in ind_fields]
     
 df_main_ind = pd.DataFrame.from_dict(main_ind)
 df_main_ind.rename(columns= {"^GSPC": "S&P500", "^DJI": "DJI", "NDAQ": "Nasdaq", "^RUT": "Russell 2000"}, index = {0: 'Open', 1: "Prev. Close", 2: "52-Wk high", 3: "52-Wk Low"}, inplace=True)
@@ -106,7 +99,7 @@ allowed_dates = pd.date_range(
 #Select and display data for specific stock
 dash_ticker=st.text_input("Enter ticker: ", "AAPL")
 try:
-    dash_data=yf.download(dash_ticker, start=dash_start, end=dash_end, progress=False)
+    dash_data=prices.download(dash_ticker, start=dash_start, end=dash_end)
 except Exception as e:
     st.error(f"Error occurred while obtaining data: {e}")
    
@@ -116,19 +109,21 @@ if not isinstance(dash_data.index, pd.DatetimeIndex):
 
 
 #Market cap and sector
-mktcap = str(yf.Ticker(dash_ticker).info.get('marketCap'))
+ticker_info = metadata.default_service().get_many([dash_ticker], ['marketCap', 'sector', 'industry', 'longBusinessSummary'])[dash_ticker]
+mktcap = str(ticker_info['marketCap'])
 commapattern = r'(?<=\d)(?=(\d{3})+(\D|$))'
 mcap = re.sub(commapattern, ',', mktcap)
 
-sector = yf.Ticker(dash_ticker).info.get('sector')
-industry = yf.Ticker(dash_ticker).info.get('industry')
-desc = yf.Ticker(dash_ticker).info.get('longBusinessSummary')
+sector = ticker_info['sector']
+industry = ticker_info['industry']
+desc = ticker_info['longBusinessSummary']
 
 
 
-fig=px.line(dash_data, x=dash_data.index, y='Adj Close', title=dash_ticker)   #the index of the DataFrame is the Date
-fig.update_layout(title_x=0.5)
-st.plotly_chart(fig)
+#downsampled to a point budget (weekly/monthly closes for long ranges) so decades of data stay light
+fig=go.Figure(charts.line_trace(dash_data['Adj Close'], 'Adj Close'))
+fig.update_layout(title=dash_ticker, title_x=0.5, xaxis_title='Date', yaxis_title='Adj Close')
+charts.plot(fig, "price_chart")
 
 col1, col2= st.columns(2)
 
@@ -145,77 +140,40 @@ if codesc:
 #key data section
 st.subheader("Key Data")
 
-price_data, fundamental_data, news = st.tabs(["Price Data", "Fundamentals", "Recent News"])
-
+#only the selected section runs; each one is a fragment, so its own widgets rerun just that section
+key_data_options = ["Price Data", "Fundamentals", "Recent News"]
+key_data_selected = st.radio("Key Data", options=key_data_options, horizontal=True, label_visibility="collapsed")
 
-def color_designate(val):
-    color = "green" if val >= 0 else "red"
-    return f"color: {color}"
 
-from alpha_vantage.fundamentaldata import FundamentalData
 alpha_key="45ORX0CSCRI25RC0"
 
-with price_data:
+@st.fragment
+@instrument.rerun_scope("dashboard.price_data_tab")
+def price_data_tab():
     st.subheader(f"Daily Pricing Data ({dash_ticker})")
-    dash_data2=dash_data
+    dash_data2=dash_data.copy()
     dash_data2["Daily % Change"] = (dash_data["Adj Close"]/dash_data["Adj Close"].shift(1) - 1) * 100
     dash_data2.dropna(inplace=True)
-    styled_dash_data2 = dash_data2.style.map(color_designate,subset=["Daily % Change"])
-    st.write(styled_dash_data2)
+    #only the visible page is styled and sent to the browser
+    tables.paged_table(dash_data2, color_columns=["Daily % Change"], key="price_table")
     
 
      
-with fundamental_data:
+@st.fragment
+@instrument.rerun_scope("dashboard.fundamental_data_tab")
+def fundamental_data_tab():
     
     st.header(f"Fundamentals of {dash_ticker}")
     st.subheader(":blue-background[Key Fundamental Data]")
-    fd=FundamentalData(alpha_key, output_format= "pandas")
+    stmnt_store=statements.default_store(alpha_key)
 
     #st.subheader(f"{dash_ticker} Company Overview")
 
-    
-
-    #annual balance sheet
-    def balance_annual():
-        balance_sheet_a=fd.get_balance_sheet_annual(dash_ticker)[0]
-        b_sheet_a=balance_sheet_a.T[2:]
-        b_sheet_a.columns=list(balance_sheet_a.T.iloc[0])
-        st.write(b_sheet_a)
-
-    #quarterly balance sheet
-    def balance_quarterly():
-        balance_sheet_q=fd.get_balance_sheet_quarterly(dash_ticker)[0]
-        b_sheet_q=balance_sheet_q.T[2:]
-        b_sheet_q.columns=list(balance_sheet_q.T.iloc[0])
-        st.write(b_sheet_q)
-
-    #annual income statement
-    def income_annual():
-        income_statement_a=fd.get_income_statement_annual(dash_ticker)[0]
-        inc_state_a=income_statement_a.T[2:]
-        inc_state_a.columns=list(income_statement_a.T.iloc[0])
-        st.write(inc_state_a)
-
-    #quarterly income statement
-    def income_quarterly():
-        income_statement_q=fd.get_income_statement_quarterly(dash_ticker)[0]
-        inc_state_q=income_statement_q.T[2:]
-        inc_state_q.columns=list(income_statement_q.T.iloc[0])
-        st.write(inc_state_q)
-
-     #annual cash flows
-    def cf_annual():
-        cash_flows_a=fd.get_cash_flow_annual(dash_ticker)[0]
-        c_flows_a=cash_flows_a.T[2:]
-        c_flows_a.columns=list(cash_flows_a.T.iloc[0])
-        st.write(c_flows_a)
-
-     #Quarterly cash flows
-    def cf_quarterly():
-        cash_flows_q=fd.get_cash_flow_annual(dash_ticker)[0]
-        c_flows_q=cash_flows_q.T[2:]
-        c_flows_q.columns=list(cash_flows_q.T.iloc[0])
-        st.write(c_flows_q)
+    def show_statement(statement, period):
+        stmnt_df=stmnt_store.get(dash_ticker, statement, period)
+        stmnt_t=stmnt_df.T[2:]
+        stmnt_t.columns=list(stmnt_df.T.iloc[0])
+        st.write(stmnt_t)
 
     #Create dropdowns
     #metrics
@@ -223,10 +181,14 @@ with fundamental_data:
 
     fund_selected = st.selectbox("Select Fundamental Data/Ratio(s)", options=fund_options)
 
-    stmnt_options=["Balance Sheet (Annual)", "Balance Sheet (Quarterly)", 
-                 "Income Statement (Annual)", "Income statement (Quarterly)", 
-                 "Cash Flow Statement(Annual)", "Cash Flow Statement (Quarterly)",
-                 ]
+    #option label -> (heading, statement, period); the selectbox and the lookup share these labels
+    stmnt_options={"Balance Sheet (Annual)": ("Annual Balance Sheets", "balance_sheet", "annual"),
+                   "Balance Sheet (Quarterly)": ("Quarterly Balance Sheets", "balance_sheet", "quarterly"),
+                   "Income Statement (Annual)": ("Annual Income Statements", "income_statement", "annual"),
+                   "Income Statement (Quarterly)": ("Quarterly Income Statements", "income_statement", "quarterly"),
+                   "Cash Flow Statement (Annual)": ("Annual Cash Flow Statements", "cash_flow", "annual"),
+                   "Cash Flow Statement (Quarterly)": ("Quarterly Cash Flow Statements", "cash_flow", "quarterly"),
+                   }
     
     try:
         def displayFundMet():
@@ -238,13 +200,13 @@ with fundamental_data:
             #if fund_selected == "Total Debt":
                 #totdebt = yf.Ticker(dash_ticker).info.get('totalDebt')
             if fund_selected == "Debt-to-Equity":
-                de = yf.Ticker(dash_ticker).info.get('debtToEquity') /100
+                de = metadata.default_service().get(dash_ticker, 'debtToEquity') /100
                 st.subheader(f"Debt-to-Equity ratio: :blue[{round(de, 2)}]")
             if fund_selected == "Quick Ratio":
-                qratio = yf.Ticker(dash_ticker).info.get('quickRatio')
+                qratio = metadata.default_service().get(dash_ticker, 'quickRatio')
                 st.subheader(f"Quick ratio: :blue[{qratio}]")
             if fund_selected == "Current Ratio":
-                cratio = yf.Ticker(dash_ticker).info.get('currentRatio')
+                cratio = metadata.default_service().get(dash_ticker, 'currentRatio')
                 st.subheader(f"Current ratio: :blue[{cratio}]")
         displayFundMet()
     except Exception as e:
@@ -255,28 +217,14 @@ with fundamental_data:
 
     #statements
     st.subheader(":blue-background[Financial Statements]")
-    stmnt_selected=st.selectbox("Select statement to review", options=stmnt_options, index=None)
+    stmnt_selected=st.selectbox("Select statement to review", options=list(stmnt_options), index=None)
 
     try:
         def display_statement():
-            if stmnt_selected == "Balance Sheet (Annual)":
-                st.subheader(f"Annual Balance Sheet ({dash_ticker})")
-                balance_annual()
-            elif stmnt_selected == "Balance Sheet (Quarterly)":
-                st.subheader(f"Quarterly Balance Sheets ({dash_ticker})")
-                balance_quarterly()
-            elif stmnt_selected == "Income Statement (Annual)":
-                st.subheader(f"Annual Income Statements ({dash_ticker})")
-                income_annual()
-            elif stmnt_selected == "Income Statement (Quarterly)":
-                st.subheader(f"Quarterly Income Statements ({dash_ticker})")
-                income_quarterly()
-            elif stmnt_selected == "Cash Flow Statement(Annual)":
-                st.subheader(f"Annual Cash Flow Statements for {dash_ticker}")
-                cf_annual()
-            elif stmnt_selected == "Cash Flow Statement(Quarterly)":
-                st.subheader(f"Quarterly Cash Flow Statements for {dash_ticker}")
-                cf_quarterly()
+            if stmnt_selected in stmnt_options:
+                heading, statement, period = stmnt_options[stmnt_selected]
+                st.subheader(f"{heading} ({dash_ticker})")
+                show_statement(statement, period)
 
         display_statement()
     except Exception as e:
@@ -284,58 +232,20 @@ with fundamental_data:
         logging.error(f"Error occurred: {str(e)}")
      
 
-with news:
+@st.fragment
+@instrument.rerun_scope("dashboard.news_tab")
+def news_tab():
     st.subheader("Recent Headlines")
 
-    #scraping finviz
-    finviz_url= f'https://finviz.com/quote.ashx?t={dash_ticker}'
-
-
-    hdr = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.3',
-    'Accept-Encoding': 'none',
-    'Accept-Language': 'en-US,en;q=0.8',
-    'Connection': 'keep-alive'}
-    req = Request(url = finviz_url, headers = hdr)
-    response = urlopen(req)
-
-    soup = BeautifulSoup(response, 'html.parser')
-
-    news_table = soup.find(id="news-table")
-
-    parsed_data=[]
-
-    for row in news_table.find_all('tr'):
-        if row.a:
-            title = row.a.text
-
-            source_div = row.find("div", class_ = "news-link-right flex gap-1 items-center")
-            source= source_div.text.strip()
-
-            source_link = row.find("a", class_="tab-link-news").attrs["href"]
-
-            time_td = row.find('td', {'align': 'right'})
-            time_data = time_td.text.strip().split(' ') if time_td else None
-            if len(time_data) == 1:
-                time = time_data[0]
-            elif time_data[0] != "Today": 
-                date = time_data[0] 
-                time = time_data[1]
-            else:
-                date = _datetime.date.today()
-                time_data[0] = date 
-                time = time_data[1]
-        parsed_data.append([date, time, title, source, source_link])
+    #scraping finviz (pooled connections, revalidated with ETag/Last-Modified)
+    parsed_data = finviz.default_fetcher().headlines(dash_ticker)
 
 
     #Organizing Data and Sentiment Scores
     sent_df= pd.DataFrame(parsed_data, columns = ['Date', 'Time', 'Title', 'Source', 'Source Link'])
 
-    vader = SentimentIntensityAnalyzer()
-
-    f = lambda title: vader.polarity_scores(title)['compound'] 
-    comp_sent = sent_df['Title'].apply(f)
+    #headline scores are cached by hash, so only unseen headlines go through VADER
+    comp_sent = sentiment.default_service().score(sent_df['Title'])
     sent_df["Compound Sentiment Score"] = comp_sent
 
     sent_df['Date'] = pd.to_datetime(sent_df.Date).dt.date
@@ -405,11 +315,23 @@ with news:
         plt.title("Daily Average Compound Sentiment Score", fontsize = 15)
         plt.style.use("seaborn-v0_8-dark")
         plt.grid(visible=True)
-        st.pyplot(plt.gcf())
+        with instrument.span("render", "sentiment_chart"):
+            st.pyplot(plt.gcf())
 
     
 
     
 
 
-    
\ No newline at end of file
+    
+
+
+if key_data_selected == "Price Data":
+    price_data_tab()
+elif key_data_selected == "Fundamentals":
+    fundamental_data_tab()
+else:
+    news_tab()
+
+instrument.end_rerun()
+instrument.sidebar_panel()
@@ -0,0 +1 @@
+"""Offline benchmarks for the StockSight data pipeline (`python -m benchmarks.run`)."""
@@ -0,0 +1,94 @@
+"""Deterministic synthetic prices, ticker info and news pages plus stub providers.
+
+Nothing here touches the network: prices come from `FakePriceProvider`,
+info dicts and headlines are generated from a seed, and the stub info
+provider can simulate upstream latency so batching effects stay visible.
+"""
+import datetime
+import os
+import random
+import time
+
+import pandas as pd
+
+from stocksight.prices import FakePriceProvider
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FINVIZ_DIR = os.path.join(FIXTURE_DIR, "finviz")
+
+END_DATE = pd.Timestamp("2025-01-01")
+
+
+def tickers(n):
+    """`n` stable synthetic ticker symbols (T0000, T0001, ...)."""
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def date_range(years):
+    return END_DATE - pd.DateOffset(years=years), END_DATE
+
+
+class StubInfoProvider:
+    """Callable stand-in for `yf.Ticker(t).info` with optional per-call latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, ticker):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        rng = random.Random(ticker)
+        price = rng.uniform(10, 500)
+        return {
+            "regularMarketOpen": price,
+            "regularMarketPreviousClose": price * rng.uniform(0.97, 1.03),
+            "fiftyTwoWeekHigh": price * rng.uniform(1.0, 1.5),
+            "fiftyTwoWeekLow": price * rng.uniform(0.5, 1.0),
+            "marketCap": int(price * rng.uniform(1e7, 1e10)),
+            "beta": rng.uniform(0.3, 2.0),
+            "debtToEquity": rng.uniform(0, 300),
+            "quickRatio": rng.uniform(0.3, 3),
+            "currentRatio": rng.uniform(0.5, 4),
+            "sector": rng.choice(["Technology", "Healthcare", "Energy", "Financial Services"]),
+            "industry": "Synthetic",
+            "longBusinessSummary": f"{ticker} is a synthetic company used for benchmarking.",
+        }
+
+
+_SUBJECTS = ["Shares", "Revenue", "Guidance", "The CEO", "Analysts", "Margins", "Buybacks", "Demand"]
+_VERBS = ["jump on", "slip after", "beat expectations despite", "disappoint amid", "hold steady ahead of"]
+_OBJECTS = ["record earnings", "weak guidance", "a new product launch", "regulatory concerns", "strong demand"]
+_SOURCES = ["Reuters", "Bloomberg", "MarketWatch", "Zacks", "Barrons.com"]
+
+
+def headlines(n, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} ({i})" for i in range(n)]
+
+
+def finviz_page(ticker, n_headlines=100, seed=0):
+    """Bytes of a finviz-like quote page with `n_headlines` synthetic rows."""
+    rng = random.Random(seed)
+    rows = []
+    day = datetime.date(2025, 1, 1)
+    for i, title in enumerate(headlines(n_headlines, seed)):
+        stamp = f"{rng.randint(1, 12):02d}:{rng.randint(0, 59):02d}{rng.choice(['AM', 'PM'])}"
+        if i % 6 == 0:
+            day -= datetime.timedelta(days=1)
+            stamp = f"{day.strftime('%b-%d-%y')} {stamp}"
+        rows.append(
+            f'<tr class="cursor-pointer has-label"><td width="130" align="right">{stamp}</td>'
+            f'<td align="left"><div class="news-link-container"><div class="news-link-left">'
+            f'<a class="tab-link-news" href="https://example.com/{ticker}/{i}">{title}</a></div>'
+            f'<div class="news-link-right flex gap-1 items-center"><span>({rng.choice(_SOURCES)})</span></div>'
+            f'</div></td></tr>')
+    filler = "".join(f"<tr><td>Metric {i}</td><td><b>{i * 1.5:.2f}</b></td></tr>" for i in range(400))
+    return (f'<html><head><title>{ticker}</title></head><body><table class="snapshot-table2">{filler}</table>'
+            f'<table id="news-table" class="fullview-news-outer news-table">{"".join(rows)}</table>'
+            f'</body></html>').encode()
+
+
+def price_provider():
+    return FakePriceProvider()
@@ -0,0 +1,167 @@
+"""Time each pipeline stage on synthetic data across history lengths and universe sizes.
+
+    python -m benchmarks.run                  # full grid: 1/5/20/45 years x 1/10/100/500 tickers
+    python -m benchmarks.run --quick          # small grid for a smoke run
+    python -m benchmarks.run --compare benchmarks/results/<old>.json
+
+Results are written to benchmarks/results/<git revision>.json (or --out).
+With --compare, stages more than --threshold slower than the old file are
+listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import fixtures
+from stocksight import analytics, bootstrap, charts, drawdowns, indicators, metadata, news, portfolio, prices, regression, sentiment
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+FULL_GRID = {"years": [1, 5, 20, 45], "tickers": [1, 10, 100, 500]}
+QUICK_GRID = {"years": [1, 5], "tickers": [1, 10]}
+HEADLINE_COUNTS = [100, 1000]
+
+
+def timed(fn, repeat=3):
+    """Best wall time of `repeat` runs, in seconds, and the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def price_stages(years, n_tickers, workdir):
+    start, end = fixtures.date_range(years)
+    names = fixtures.tickers(n_tickers)
+    store = prices.PriceStore(fixtures.price_provider(), root=os.path.join(workdir, f"{years}y_{n_tickers}"))
+    out = {}
+
+    out["download_cold"], _ = timed(lambda: [store.get(t, start, end) for t in names], repeat=1)
+    out["download_warm"], frames = timed(lambda: [store.get(t, start, end) for t in names])
+    bench = store.get("^GSPC", start, end)["Adj Close"]
+    rfr = analytics.daily_from_annual(pd.Series(0.04, index=bench.index))
+    closes = pd.concat({t: f["Adj Close"] for t, f in zip(names, frames)}, axis=1)
+
+    out["log_returns"], returns = timed(lambda: analytics.log_returns(closes))
+    bench_ret = analytics.log_returns(bench)
+    out["metrics"], _ = timed(lambda: analytics.compute_metrics(returns, bench_ret, rfr))
+    # what the Charts page runs per ticker: every rolling window from one pass, then the full-period fit
+    out["rolling_beta"], _ = timed(
+        lambda: [regression.rolling_ols(returns[t], bench_ret, regression.DEFAULT_WINDOWS) for t in names])
+    out["regression"], _ = timed(lambda: regression.ols(returns, bench_ret))
+    out["drawdown"], _ = timed(lambda: analytics.drawdown_matrix(returns.to_numpy()))
+    out["drawdown_episodes"], _ = timed(lambda: drawdowns.top_drawdowns(returns, 10))
+    out["bootstrap"], _ = timed(lambda: bootstrap.confidence_intervals(returns[names[0]], bench_ret, rfr, 1000), repeat=1)
+    out["portfolio"], _ = timed(lambda: portfolio.frontier(*portfolio.moments(returns.dropna()), long_only=True))
+    params = indicators.Params(sma=(5, 10, 20, 50, 100, 200), ema=(5, 10, 20, 50, 100, 200))
+    out["indicators"], _ = timed(lambda: [indicators.compute(f, params) for f in frames])
+    out["chart_build"], _ = timed(lambda: _chart_json(closes[names[0]]))
+    return out
+
+
+def _chart_json(series):
+    import plotly.graph_objects as go
+
+    return go.Figure(charts.line_trace(series, "Adj Close")).to_json()
+
+
+def metadata_stage(n_tickers, latency=0.02):
+    service = metadata.MetadataService(fixtures.StubInfoProvider(latency))
+    names = fixtures.tickers(n_tickers)
+    fields = list(metadata.FIELD_TTLS)
+    cold, _ = timed(lambda: service.get_many(names, fields), repeat=1)
+    warm, _ = timed(lambda: service.get_many(names, fields))
+    return {"metadata_cold": cold, "metadata_warm": warm}
+
+
+def news_stages(n_headlines, workdir):
+    page = fixtures.finviz_page("BENCH", n_headlines)
+    out = {}
+    out["news_parse"], rows = timed(lambda: news.parse_news(page))
+    titles = [row[2] for row in rows]
+    # the suite runs offline, so the lexicon is never downloaded here
+    if not sentiment.has_vader_lexicon():
+        print(f"skipping sentiment stages ({n_headlines} headlines): VADER lexicon not installed "
+              "(python -m nltk.downloader vader_lexicon)")
+        return out
+    service = sentiment.SentimentService(os.path.join(workdir, f"sentiment_{n_headlines}.sqlite"))
+    out["sentiment_cold"], _ = timed(lambda: service.score(titles), repeat=1)
+    out["sentiment_warm"], _ = timed(lambda: service.score(titles))
+    return out
+
+
+def revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unversioned"
+
+
+def run(grid):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for years in grid["years"]:
+            for n in grid["tickers"]:
+                stages = price_stages(years, n, workdir)
+                results += [{"stage": s, "years": years, "tickers": n, "seconds": v} for s, v in stages.items()]
+                print(f"{years:>2}y x {n:>3} tickers: " + ", ".join(f"{s} {v * 1000:.1f}ms" for s, v in stages.items()))
+        for n in grid["tickers"]:
+            for s, v in metadata_stage(n).items():
+                results.append({"stage": s, "years": None, "tickers": n, "seconds": v})
+        for n in HEADLINE_COUNTS:
+            for s, v in news_stages(n, workdir).items():
+                results.append({"stage": s, "years": None, "tickers": None, "headlines": n, "seconds": v})
+    return results
+
+
+def compare(new, old, threshold):
+    """Rows of (key, old seconds, new seconds) where new is slower by more than `threshold`."""
+    def key(r):
+        return (r["stage"], r.get("years"), r.get("tickers"), r.get("headlines"))
+
+    before = {key(r): r["seconds"] for r in old["results"]}
+    return [(key(r), before[key(r)], r["seconds"]) for r in new["results"]
+            if key(r) in before and r["seconds"] > before[key(r)] * (1 + threshold)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="run the small grid")
+    parser.add_argument("--out", help="where to write results (default: benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run(QUICK_GRID if args.quick else FULL_GRID),
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(report, json.load(f), args.threshold)
+        for k, before, after in slower:
+            print(f"REGRESSION {k}: {before * 1000:.1f}ms -> {after * 1000:.1f}ms")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
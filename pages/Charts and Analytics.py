@@ -1,16 +1,19 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import streamlit as st
 import _datetime # type: ignore
 import plotly.express as px
-import statsmodels
 import plotly.graph_objects as go
+from stocksight import analytics, batch, bootstrap, charts, drawdowns, framecache, indicators, instrument, metadata, prices, reference, regression
+from stocksight.graph import Graph
 
 
 
 
 
+#pandas copy-on-write: shared cached frames are handed out as shallow copies (see stocksight/framecache.py)
+framecache.enable_copy_on_write()
+
 st.set_page_config(
     page_title="Charts and Analytics",
     page_icon="📈"
@@ -42,6 +45,9 @@ def color_designate(val):
 
 st.markdown(main_bg, unsafe_allow_html=True)
 
+instrument.setup()
+instrument.begin_rerun("charts_and_analytics")
+
 
 
 st.sidebar.success("Select Page")
@@ -57,72 +63,101 @@ start = st.date_input("Start Date: ", _datetime.datetime.today() - _datetime.tim
 end = st.date_input("End Date: ", _datetime.datetime.today())
 date_diff = (end-start).days
 user_ticker_choice=st.text_input("Enter Ticker: ", 'AAPL')
+roll_windows = st.multiselect("Rolling Beta Window(s) (days)", options = regression.DEFAULT_WINDOWS, default = [7])
 
-#specific stock data
-df=yf.download(user_ticker_choice,start,end, progress=False)  
+#Derived series are graph nodes memoized per session; a widget change only recomputes the nodes downstream of it
+if 'charts_graph_memo' not in st.session_state:
+    st.session_state['charts_graph_memo'] = {}
+graph = Graph(st.session_state['charts_graph_memo'], shared = framecache.default_cache())
+graph.param('ticker', user_ticker_choice)
+graph.param('start', start)
+graph.param('end', end)
+graph.param('roll_windows', tuple(roll_windows or [7]))
 
+#specific stock data
+@graph.node('df', inputs = ['ticker', 'start', 'end'], shared = False)
+def get_df(ticker, start, end):
+    return prices.download(ticker, start, end)
 
-#s&p500 data
-sp500_benchmark= yf.download('^GSPC', start, end, progress=False)
+#s&p500 data (shared across sessions, refreshed once per trading day)
+@graph.node('sp500_benchmark', inputs = ['start', 'end'], shared = False)
+def get_benchmark(start, end):
+    return reference.default_store().benchmark(start, end)
 
 #Useful Variables
-shared_variables = {"logreturns": np.log(df['Adj Close']/df['Adj Close'].shift(1)),
-                        'bench_log': np.log(sp500_benchmark['Adj Close']/sp500_benchmark['Adj Close'].shift(1))
-                        }
-
-
-#13wk Treasury Bill
-
-def get_annual_rfr(ticker = '^IRX', start = start, end = end):
-    annual_rfr = yf.download(ticker, start, end, progress=False)['Adj Close']/100
-    return annual_rfr
-
-
-
-def daily_rfr(periods = 252, start = start, end = end):
-    return (1 + get_annual_rfr()) ** (1/periods) - 1
-
-daily_rfr(periods = 252, start = start, end = end)
-    
-def get_rfr():
-    daily_r_free = daily_rfr()
-    rates_data = pd.DataFrame({"Annual_rfr": get_annual_rfr(), "Daily_rfr": daily_r_free})
-    return rates_data
-
-rates_df = get_rfr()
-rates_df['sec_ret'] = shared_variables['logreturns']
-rates_df['ex_ret'] = rates_df['sec_ret']-rates_df['Daily_rfr']
-std_excess = np.std(rates_df['sec_ret']-rates_df['Daily_rfr'])
-
-avg_excess = rates_df['ex_ret'].mean()
-
+@graph.node('shared_variables', inputs = ['df', 'sp500_benchmark'])
+def get_shared_variables(df, sp500_benchmark):
+    return {"logreturns": analytics.log_returns(df['Adj Close']),
+            'bench_log': analytics.log_returns(sp500_benchmark['Adj Close'])
+            }
+
+
+#13wk Treasury Bill (shared like the benchmark)
+@graph.node('rates_df', inputs = ['start', 'end'], shared = False)
+def get_rfr(start, end):
+    return reference.default_store().risk_free(start, end)
+
+#Volatility, drawdown, beta, alpha, Sharpe and CAPM return for the selected ticker (nightly batch results when available)
+@graph.node('key_metrics', inputs = ['shared_variables', 'rates_df', 'ticker', 'start', 'end'])
+def get_key_metrics(shared_variables, rates_df, ticker, start, end):
+    precomputed = batch.read_metrics(ticker, start, end)
+    if precomputed is not None:
+        return precomputed
+    return analytics.compute_metrics(shared_variables['logreturns'].rename(ticker),
+                                     shared_variables['bench_log'], rates_df['Daily_rfr']).loc[ticker]
+
+#Dataframe housing log returns for market (s&p 500) and specific stock
+@graph.node('log_df', inputs = ['shared_variables'])
+def get_log_df(shared_variables):
+    stock_data = shared_variables['logreturns'].rename('stock_ret').dropna()
+    benchmark_data = shared_variables['bench_log'].rename('bench_ret').dropna()
+    return pd.concat([stock_data, benchmark_data], axis = 1)
+
+#Rolling stock vs market fits for every selected window in one pass (same sums as the full-period fit)
+@graph.node('roll_stats', inputs = ['log_df', 'roll_windows'])
+def get_roll_stats(log_df, roll_windows):
+    fits = regression.rolling_ols(log_df['stock_ret'], log_df['bench_ret'], roll_windows)
+    return {w: pd.DataFrame({c: fit[c]['stock_ret'] for c in regression.FIT_COLUMNS}) for w, fit in fits.items()}
+
+#Stock vs market regression over the whole period (beta, alpha, R², standard errors all from one fit)
+@graph.node('market_fit', inputs = ['log_df', 'rates_df'])
+def get_market_fit(log_df, rates_df):
+    return regression.capm(log_df['stock_ret'], log_df['bench_ret'], rates_df['Daily_rfr'])
+
+#Growth, running peak and every drawdown episode, kept off the price frame
+@graph.node('drawdown', inputs = ['shared_variables'])
+def get_drawdown(shared_variables):
+    logreturns = shared_variables['logreturns']
+    growth, peak, _ = analytics.drawdown_matrix(logreturns.to_numpy())
+    return {"CumulativeReturns": pd.Series(growth, index = logreturns.index),
+            "CumulativeMax": pd.Series(peak, index = logreturns.index),
+            "episodes": drawdowns.episodes(logreturns)}
+
+#Block-bootstrap 95% intervals for Sharpe, beta, alpha and volatility (only computed when shown)
+@graph.node('metric_ci', inputs = ['log_df', 'rates_df', 'n_resamples'])
+def get_metric_ci(log_df, rates_df, n_resamples):
+    return bootstrap.confidence_intervals(log_df['stock_ret'], log_df['bench_ret'], rates_df['Daily_rfr'], n_resamples)
+
+#CAPM uses the shortest window
+@graph.node('df_roll_beta', inputs = ['roll_stats'])
+def get_roll_beta(roll_stats):
+    df_roll_beta = roll_stats[min(roll_stats)][["beta"]].dropna()
+    df_roll_beta.columns = ["Beta_roll"]
+    return df_roll_beta
+
+#page code below adds columns to df_roll_beta, so it works on a copy of the memoized frame
+df = graph.get('df')
+sp500_benchmark = graph.get('sp500_benchmark')
+shared_variables = graph.get('shared_variables')
+rates_df = graph.get('rates_df')
 risk_free_rate = rates_df['Daily_rfr'].mean()
-
-#Dataframe housing log returns for market and specific stock
-#get dataframe with log returns for specific stock
-stock_data = df.copy()
-stock_data['stock_ret'] = shared_variables['logreturns']
-stock_data.drop(stock_data.columns[0:6], axis = 1, inplace = True)
-stock_data.dropna(inplace = True)
-#dataframe with benchmark (s&p 500) log returns
-benchmark_data = sp500_benchmark.copy()
-benchmark_data['bench_ret'] = shared_variables['bench_log']
-benchmark_data.drop(benchmark_data.columns[0:6], axis = 1, inplace = True)
-benchmark_data.dropna(inplace = True)
-#New dataframe housing log returns
-log_df = pd.concat([stock_data, benchmark_data], axis = 1)
-log_df.reset_index()
-#Covariance between stock and benchmark (s&p)
-covariance = np.cov(log_df['stock_ret'], log_df['bench_ret'], ddof=1)[1,0]
-#Variance of benchmark
-variance_bench = np.var(log_df['bench_ret'])
-#Beta calculation
-beta = covariance/variance_bench
-#Rolling beta dataframe
-window = 7
-cov_roll = log_df['stock_ret'].rolling(window).cov(log_df['bench_ret']).dropna()
-var_bench_roll = log_df['bench_ret'].rolling(window).var().dropna()
-df_roll_beta = pd.DataFrame({"Cov_roll": cov_roll, "Var_roll": var_bench_roll, "Beta_roll": cov_roll/var_bench_roll})
+key_metrics = graph.get('key_metrics')
+log_df = graph.get('log_df')
+#Beta calculation (beta and alpha are shown from the same fit as their standard errors)
+market_fit = graph.get('market_fit')
+beta = market_fit['beta']
+roll_stats = graph.get('roll_stats')
+df_roll_beta = graph.get('df_roll_beta').copy()
     
 
 st.subheader(f'Displays data from {start.strftime("%B %d, %Y")} to {end.strftime("%B %d, %Y")}')
@@ -136,75 +171,75 @@ st.write(df.describe())
 st.subheader("Closing Price Over Time (with custom-Length moving average)")
 
 movavg_options = ["Simple Moving Average(SMA)", "Exponential Moving Average(EMA)"]
+movavg_lengths = [5, 10, 20, 50, 100, 200]
+indicator_options = ["Bollinger Bands", "RSI", "MACD", "ATR"]
+ma_colors = ["#17becf", "#bcbd22", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#2ca02c"]
 
-movavg_selected = st.selectbox("Select Type of Moving Average", options = movavg_options)
+#SMA and EMA for every selected length plus RSI/MACD/Bollinger/ATR, computed together (shared across sessions)
+@graph.node('indicators', inputs = ['ticker', 'start', 'end', 'df', 'movavg_lengths'])
+def get_indicators(ticker, start, end, df, movavg_lengths):
+    params = indicators.Params(sma = movavg_lengths, ema = movavg_lengths)
+    return indicators.get(ticker, start, end, df, params)
 
-movavg_length = st.number_input("Enter Length (days) of Moving Average", 1)
 
+def plot_moving_averages(kind, lengths, overlays):
+    table = graph.get('indicators')
 
-def plot_sma():
-    sma_custom=df.Close.rolling(movavg_length).mean()
+    fig_movavg = go.Figure()
 
-    fig_sma_custom= go.Figure()
+    for i, length in enumerate(lengths):
+        fig_movavg.add_trace(charts.line_trace(table[f"{kind}{length}"], f"{kind}{length}", ma_colors[i % len(ma_colors)]))
 
-    fig_sma_custom.add_trace(go.Scatter(
-        x= df.index,
-        y= sma_custom,
-        mode='lines',
-        name=f"SMA{movavg_length}",
-        line=dict(color="#17becf")
-    ))
+    fig_movavg.add_trace(charts.line_trace(df.Close, "Closing Price", '#d62728'))
 
-    fig_sma_custom.add_trace(go.Scatter(
-        x= df.index,
-        y= df.Close,
-        mode= "lines",
-        name= "Closing Price",
-        line=dict(color='#d62728')
-    ))
+    if "Bollinger Bands" in overlays:
+        fig_movavg.add_trace(charts.line_trace(table["BB_upper"], "Bollinger Upper", "#ff7f0e"))
+        fig_movavg.add_trace(charts.line_trace(table["BB_lower"], "Bollinger Lower", "#ff7f0e"))
 
-    fig_sma_custom.update_layout(
+    fig_movavg.update_layout(
         xaxis_title="Time",
         yaxis_title="Closing Price",
-        title=f"{user_ticker_choice} Closing Price with {movavg_length}-Day SMA",
-        title_x = 0.34
+        title=f"{user_ticker_choice} Closing Price with {', '.join(str(l) for l in lengths)}-Day {kind}",
+        title_x = 0.3
     )
 
-    st.plotly_chart(fig_sma_custom)
-
-def plot_ema():
-    ema_custom = df.Close.ewm(span = movavg_length, min_periods = movavg_length).mean()
-
-    fig_ema = go.Figure()
-
-    fig_ema.add_trace(go.Scatter(
-        x= df.index,
-        y= ema_custom,
-        mode= "lines",
-        name= f"EMA{movavg_length}",
-        line=dict(color="#17becf")
-    ))
-
-    fig_ema.add_trace(go.Scatter(
-        x= df.index,
-        y= df.Close,
-        mode= "lines",
-        name="Closing Price",
-        line=dict(color="#d62728")
-    ))
-
-    fig_ema.update_layout(
-        xaxis_title = "Time",
-        yaxis_title = "Closing Price",
-        title = f"{user_ticker_choice} Closing Price with {movavg_length}-day EMA"
-    )
+    charts.plot(fig_movavg, "fig_movavg")
+
+    if "RSI" in overlays:
+        fig_rsi = go.Figure(charts.line_trace(table["RSI14"], "RSI14", "#17becf"))
+        fig_rsi.add_hline(y = 70, line_dash = "dash", line_color = "#d62728")
+        fig_rsi.add_hline(y = 30, line_dash = "dash", line_color = "#2ca02c")
+        fig_rsi.update_layout(xaxis_title = "Time", yaxis_title = "RSI", title = f"{user_ticker_choice} 14-Day RSI", title_x = 0.4)
+        charts.plot(fig_rsi, "fig_rsi")
+
+    if "MACD" in overlays:
+        fig_macd = go.Figure()
+        fig_macd.add_trace(charts.line_trace(table["MACD"], "MACD", "#17becf"))
+        fig_macd.add_trace(charts.line_trace(table["MACD_signal"], "Signal", "#d62728"))
+        fig_macd.update_layout(xaxis_title = "Time", yaxis_title = "MACD", title = f"{user_ticker_choice} MACD (12, 26, 9)", title_x = 0.4)
+        charts.plot(fig_macd, "fig_macd")
 
-    st.plotly_chart(fig_ema)
+    if "ATR" in overlays:
+        fig_atr = go.Figure(charts.line_trace(table["ATR14"], "ATR14", "#17becf"))
+        fig_atr.update_layout(xaxis_title = "Time", yaxis_title = "Average True Range", title = f"{user_ticker_choice} 14-Day ATR", title_x = 0.4)
+        charts.plot(fig_atr, "fig_atr")
 
-if movavg_selected == "Simple Moving Average(SMA)":
-    plot_sma()
-else:
-    plot_ema()
+#runs as a fragment: changing the moving average only reruns this section
+@st.fragment
+@instrument.rerun_scope("charts_and_analytics.movingAverageSection")
+def movingAverageSection():
+    movavg_selected = st.selectbox("Select Type of Moving Average", options = movavg_options)
+
+    movavg_length = st.number_input("Enter Length (days) of Moving Average", 1)
+    extra_lengths = st.multiselect("Additional Lengths (days)", options = movavg_lengths, key = 'extra_movavg_lengths')
+    overlays = st.multiselect("Indicators", options = indicator_options, key = 'indicator_overlays')
+    lengths = tuple(sorted({int(movavg_length), *extra_lengths}))
+    graph.param('movavg_lengths', lengths)
+
+    kind = "SMA" if movavg_selected == "Simple Moving Average(SMA)" else "EMA"
+    plot_moving_averages(kind, lengths, overlays)
+
+movingAverageSection()
 
 #CALCULATE AND DISPLAY METRICS
 
@@ -221,103 +256,114 @@ if 'metrics_selected' not in st.session_state:
 def metricMultiSelect():
     selected_metrics = st.session_state['metrics_selected']   #this is bc m_selection will be the key (ensures m_selected is updated; selection is updated, synchronized)
 
+    #95% bootstrap interval under a point estimate, when enabled
+    def displayInterval(metric):
+        if not st.session_state.get('show_ci'):
+            return
+        ci = graph.get('metric_ci').loc[metric]
+        st.write(f"95% bootstrap interval: [{ci['lower']:.4f}, {ci['upper']:.4f}] (standard error {ci['std_error']:.4f}, "
+                 f"{st.session_state['n_resamples']} resamples)")
+
     #log returns
     def displayLog():
         logreturns = shared_variables['logreturns']
-        fig_log = px.line(df, x = df.index, y= logreturns, title = f"Logarithmic Returns for {user_ticker_choice}")
+        fig_log = go.Figure(charts.line_trace(logreturns, "Log Return"))
         fig_log.update_layout(
         xaxis_title= "Time",
         yaxis_title= "Log Return",
+        title= f"Logarithmic Returns for {user_ticker_choice}",
         title_x = 0.35)
-        st.plotly_chart(fig_log)
+        charts.plot(fig_log, "fig_log")
         return True   #prevents excessive/unnecessary function calls
     
     #compound returns
     def displayCompReturns():             
         cumcompreturns = np.exp(shared_variables['logreturns'].cumsum()) * 100     #Just Buy and Hold strategy
-        fig_comp = px.line(df, x = df.index, y = cumcompreturns, title = f"Compound Returns (%) Over Time for {user_ticker_choice}")
+        fig_comp = go.Figure(charts.line_trace(cumcompreturns, "Compound Returns", "blue"))
         fig_comp.update_layout(
             xaxis_title = "Time", 
             yaxis_title = "Compound Returns (%)",
+            title = f"Compound Returns (%) Over Time for {user_ticker_choice}",
             title_x = 0.3
         )
-        fig_comp.update_traces(line_color = "blue")
-        st.plotly_chart(fig_comp)
+        charts.plot(fig_comp, "fig_comp")
         return True
 
     #Volatility/standard deviation
     def displayVolatility():
-        volatility = shared_variables['logreturns'].std()
+        volatility = key_metrics['volatility']
         vol_df = pd.DataFrame({"Volatility": [volatility]})
         st.subheader(f"Volatility of {user_ticker_choice} for the period {start}-{end}: ") 
         st.subheader(f":gray-background[:blue[{volatility:3f}]]")
+        displayInterval('volatility')
         return True
     
     #Drawdown
     def displayDrawDown():
-        df['CumulativeReturns'] = np.exp(shared_variables['logreturns'].cumsum())   
-        df['CumulativeMax'] = df.CumulativeReturns.cummax()
-        df['Drawdown'] = df['CumulativeMax'] - df['CumulativeReturns'] 
-        df['Drawdown(%)'] = (df['CumulativeMax'] - df['CumulativeReturns'])/df['CumulativeMax'] * 100
-        maxDrawDown =  df['Drawdown(%)'].max()
-        maxDrawDate = df['Drawdown(%)'].idxmax()
-        st.subheader(f'The Maximum Drawdown was :blue[{maxDrawDown:2f}%] on {maxDrawDate.strftime("%B %d, %Y")}')
+        dd = graph.get('drawdown')
+        if len(dd['episodes']):
+            deepest = dd['episodes'].loc[dd['episodes']['depth'].idxmax()]
+            st.subheader(f'The Maximum Drawdown was :blue[{deepest["depth"]:2f}%] on {deepest["trough"].strftime("%B %d, %Y")}')
         fig_drawdown = go.Figure()
-        fig_drawdown.add_trace(go.Scatter(
-            x=df.index,
-            y=df['CumulativeReturns'],
-            mode="lines",
-            name="Cumulative Returns",
-            line=dict(color="#17becf")
-        ))
-        fig_drawdown.add_trace(go.Scatter(
-            x=df.index,
-            y=df['CumulativeMax'],
-            mode="lines",
-            name="Cumulative Max (Peak)",
-            line=dict(color="#d62728")
-        ))
-        fig_drawdown.add_trace(go.Scatter(
-            x=df.index,
-            y=df['Drawdown'],
-            mode="lines",
-            name="Drawdown",
-            line=dict(color="#e35f1e")
-        ))
+        fig_drawdown.add_trace(charts.line_trace(dd['CumulativeReturns'], "Cumulative Returns", "#17becf"))
+        fig_drawdown.add_trace(charts.line_trace(dd['CumulativeMax'], "Cumulative Max (Peak)", "#d62728"))
+        fig_drawdown.add_trace(charts.line_trace(dd['CumulativeMax'] - dd['CumulativeReturns'], "Drawdown", "#e35f1e"))
         fig_drawdown.update_layout(
             xaxis_title= "Time",
             yaxis_title= "Drawdown",
             title= f"Drawdowns with Cumulative Returns and Maxima for {user_ticker_choice}",
             title_x = 0.1
         )
-        st.plotly_chart(fig_drawdown)
+        charts.plot(fig_drawdown, "fig_drawdown")
+
+        top_n = st.number_input("Largest drawdowns to list", min_value = 1, max_value = 50, value = 10, key = "drawdown_top_n")
+        worst = dd['episodes'].nlargest(int(top_n), 'depth').drop(columns = 'ticker')
+        worst = worst.rename(columns = {"peak": "Peak", "trough": "Trough", "recovery": "Recovery", "depth": "Depth (%)",
+                                        "decline_days": "Peak to Trough (days)", "recovery_days": "Trough to Recovery (days)",
+                                        "duration_days": "Duration (days)"})
+        st.dataframe(worst, hide_index = True)
 
         return True
 
     #Sharpe Ratio
     def displaySharpe():
-        sharpe_ratio = avg_excess/std_excess
+        sharpe_ratio = key_metrics['sharpe']
         st.subheader(f"Sharpe Ratio for {user_ticker_choice} for the period {start} to {end}: :blue[{sharpe_ratio:2f}]")
+        displayInterval('sharpe')
         return True
 
 
     #Beta
     def displayBeta():
-        beta_today = yf.Ticker(user_ticker_choice).info.get('beta') 
+        beta_today = metadata.default_service().get(user_ticker_choice, 'beta') 
         #beta = (covariance of investment and benchmark returns)/variance of benchmark (market)
         if date_diff >= 1:
             st.subheader(f"Beta coefficient for the period {start}  to  {end}: :blue[{beta:2f}]")
+            st.write(f"Standard error: {market_fit['beta_se']:.4f} | R-Squared: {market_fit['r_squared']:.4f} | "
+                     f"Residual volatility (daily): {market_fit['resid_vol']:.4f}")
+            displayInterval('beta')
         st.subheader(f"Beta coefficient, today,  {_datetime.datetime.today().strftime('%Y-%m-%d')}:")
         st.subheader(f":blue[{beta_today}]")
+        fig_beta = go.Figure()
+        for i, w in enumerate(roll_stats):
+            fig_beta.add_trace(charts.line_trace(roll_stats[w]["beta"], f"{w}-day", ma_colors[i % len(ma_colors)]))
+        fig_beta.update_layout(
+            xaxis_title = "Time",
+            yaxis_title = "Beta",
+            legend_title = "Window",
+            title = f"Rolling Beta for {user_ticker_choice}",
+            title_x = 0.35
+        )
+        charts.plot(fig_beta, "fig_beta")
         return True
     
 
     #Alpha; alpha = avgstockret - (risk free rate + beta *(avgmarketret - risk free rate))
     def displayAlpha():
-        avg_stock_ret = shared_variables['logreturns'].mean()
-        avg_market_ret = shared_variables['bench_log'].mean()
-        alpha = avg_stock_ret - (risk_free_rate + beta * (avg_market_ret - risk_free_rate))
+        alpha = market_fit['alpha']
         st.subheader(f"Alpha for {user_ticker_choice} for the period {start} to {end}: :blue[{alpha:2f}]")
+        st.write(f"Standard error: {market_fit['alpha_se']:.6f}")
+        displayInterval('alpha')
         return True
     
     #CAPM; expected return = rfr + beta(market_ret - riskfreerate)
@@ -325,16 +371,20 @@ def metricMultiSelect():
     def displayCapm():
         equity_risk_premium =  shared_variables['bench_log'] - risk_free_rate
         exp_return = risk_free_rate + df_roll_beta["Beta_roll"] * equity_risk_premium 
-        exp_return_period = risk_free_rate.mean() + beta * equity_risk_premium.mean()
+        exp_return_period = key_metrics['capm_return']
         df_roll_beta["Ke"] = exp_return  #expected return (cost of equity)
 
-        fig_capm = px.scatter(df_roll_beta, x="Beta_roll", y="Ke", title = "CAPM", template = "plotly_dark", trendline = "ols")
+        capm_fit = regression.ols(df_roll_beta["Ke"], df_roll_beta["Beta_roll"]).iloc[0]
+        fig_capm = px.scatter(df_roll_beta, x="Beta_roll", y="Ke", title = "CAPM", template = "plotly_dark")
+        beta_range = np.array([df_roll_beta["Beta_roll"].min(), df_roll_beta["Beta_roll"].max()])
+        fig_capm.add_trace(go.Scatter(x = beta_range, y = capm_fit['alpha'] + capm_fit['beta'] * beta_range,
+                                      mode = "lines", name = "OLS fit", showlegend = False))
         fig_capm.update_layout(title_x=0.5, 
                                xaxis_title = "Rolling Beta",
                                yaxis_title = "Expected Returns (Cost of Equity(Ke))"
                  )
-        st.plotly_chart(fig_capm)
-        a = px.get_trendline_results(fig_capm).px_fit_results.iloc[0].rsquared
+        charts.plot(fig_capm, "fig_capm")
+        a = capm_fit['r_squared']
         
         st.subheader(f"Expected Returns (%) over entire period {start} to {end} using beta = {beta:2f}: ")
         st.subheader(f":gray-background[:violet[{str((exp_return_period * 100)):}]]")
@@ -362,18 +412,19 @@ def metricMultiSelect():
         displayCapm()
 
 
-st.multiselect(label="Select Metric(s)", options=metric_options, key ='metrics_selected')  
-metricMultiSelect()
-st.write(":blue[Note:] Refer to 'Help' page for additional information about a metric/model.")
-
-
-
-
-
-
-
-    
-    
-    
+#runs as a fragment: selecting metrics only reruns this section
+@st.fragment
+@instrument.rerun_scope("charts_and_analytics.metricSection")
+def metricSection():
+    st.multiselect(label="Select Metric(s)", options=metric_options, key ='metrics_selected')  
+    st.toggle("Show bootstrap confidence intervals", False, key = 'show_ci')
+    if st.session_state['show_ci']:
+        st.select_slider("Resamples", options = [500, 1000, 2000, 5000], value = 1000, key = 'n_resamples')
+        graph.param('n_resamples', st.session_state['n_resamples'])
+    metricMultiSelect()
 
+metricSection()
+st.write(":blue[Note:] Refer to 'Help' page for additional information about a metric/model.")
 
+instrument.end_rerun()
+instrument.sidebar_panel()
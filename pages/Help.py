@@ -53,6 +53,10 @@ st.write("  \n  To revert to the original graph format, select either the autosc
 st.header("Accesing Data")
 st.write(f":orange[Fundamental Data Access:] Currently, the :grey-background[:blue[AlphaVantage API]] ({url_av}) used to obtain fundamental data caps daily API request limits at 25 for non-premium plans."
          "  \n  This results in the error message: 'Sorry, daily API request limit (25) exceeded.' The number of available requests refreshes daily.")
+st.header("Portfolio Page")
+st.write("Enter one holding per line as :grey-background[TICKER weight] (for example 'AAPL 0.4'); weights are rescaled to sum to 1."
+         "  \n  Statistics use only the dates on which every holding traded. The efficient frontier shows the lowest-volatility mix of the same holdings for each level of expected return; "
+         "turn off 'Long only' to allow short positions.")
 st.header("More Information (General)")
 st.subheader("Useful Links")
 st.markdown("-General Reference: https://www.investopedia.com/")
@@ -0,0 +1,138 @@
+import pandas as pd
+import numpy as np
+import streamlit as st
+import plotly.graph_objects as go
+from stocksight import bars, charts, framecache, instrument, live, prices, tables
+
+
+
+#pandas copy-on-write: shared cached frames are handed out as shallow copies (see stocksight/framecache.py)
+framecache.enable_copy_on_write()
+
+st.set_page_config(
+    page_title="Live",
+    page_icon="⏱️"
+
+)
+
+
+
+main_bg= f"""
+<style>
+[data-testid="stAppViewContainer"] {{
+
+background-image: url(https://static.vecteezy.com/system/resources/previews/002/816/559/non_2x/abstract-blue-technology-diagonal-geometric-design-background-with-light-effect-free-vector.jpg);
+background-size: cover;
+}}
+[data-testid="stHeader"] {{
+background-color: rgba(0, 0, 0, 0);
+}}
+[data-testid="stSidebar"] {{
+background-image: url(https://static.vecteezy.com/system/resources/previews/002/816/559/non_2x/abstract-blue-technology-diagonal-geometric-design-background-with-light-effect-free-vector.jpg);
+background-position: center;
+}}
+</style>
+"""
+
+st.markdown(main_bg, unsafe_allow_html=True)
+
+instrument.setup()
+instrument.begin_rerun("live")
+
+
+st.sidebar.success("Select Page")
+
+
+st.title('Live Intraday')
+st.subheader("1-Minute Bars, Updated Incrementally")
+live_ticker = st.text_input("Enter Ticker: ", 'AAPL').strip().upper()
+col1, col2, col3 = st.columns(3)
+ema_span = col1.number_input("EMA Length (bars)", 2, 390, 20)
+beta_window = col2.number_input("Rolling Beta Window (bars)", 5, 390, 60)
+refresh_seconds = col3.number_input("Refresh Every (seconds)", 5, 300, 15)
+
+
+#previous session close for "Daily % Change" (from the shared daily price cache)
+def previous_close(ticker):
+    today = pd.Timestamp.today().normalize()
+    try:
+        daily = prices.download(ticker, today - pd.Timedelta(days = 10), today)
+    except Exception:
+        return np.nan
+    return float(daily['Close'].iloc[-1]) if len(daily) else np.nan
+
+
+#one streaming session per ticker and settings; later reruns only push the new bars
+session_key = (live_ticker, int(ema_span), int(beta_window))
+if st.session_state.get('live_session_key') != session_key:
+    st.session_state['live_session_key'] = session_key
+    #stored bars are kept per feed, so replayed sessions never land in the real history
+    feed = live.default_feed(live_ticker)
+    st.session_state['live_session'] = live.LiveSession(live_ticker, feed = feed, ema_span = int(ema_span), beta_window = int(beta_window),
+                                                        previous_close = previous_close(live_ticker),
+                                                        bar_store = bars.default_store(feed.name))
+
+
+def liveSection():
+    session = st.session_state['live_session']
+    try:
+        session.update()
+    except Exception as e:
+        st.error(f"Could not fetch intraday bars: {str(e)}")
+    data = session.frame()
+    if not len(data):
+        st.info("Waiting for the first completed bar...")
+        return
+
+    last = data.iloc[-1]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Last", f"{last['Close']:.2f}", f"{last['Daily % Change']:.2f}%")
+    m2.metric(f"EMA{int(ema_span)}", f"{last['EMA']:.2f}")
+    m3.metric(f"Beta ({int(beta_window)} bars)", "n/a" if np.isnan(last['beta']) else f"{last['beta']:.2f}")
+    m4.metric("Drawdown", f"{last['drawdown'] * 100:.2f}%")
+
+    fig_live = go.Figure()
+    fig_live.add_trace(charts.line_trace(data['Close'], "Close", "#d62728", aggregate = False))
+    fig_live.add_trace(charts.line_trace(data['EMA'], f"EMA{int(ema_span)}", "#17becf", aggregate = False))
+    fig_live.update_layout(
+        xaxis_title = "Time",
+        yaxis_title = "Price",
+        title = f"{live_ticker} Intraday ({len(data)} bars)",
+        title_x = 0.35
+    )
+    charts.plot(fig_live, "fig_live")
+
+    tables.paged_table(data, color_columns = ["Daily % Change"], key = "live_table")
+
+#runs as a fragment on a timer: only this section reruns on each refresh
+st.fragment(run_every = int(refresh_seconds))(instrument.rerun_scope("live.liveSection")(liveSection))()
+
+#HISTORY FROM THE BAR STORE (the resolution follows the selected range)
+history_ranges = {"1 Day": 1, "5 Days": 5, "1 Month": 30, "6 Months": 182, "1 Year": 365, "5 Years": 5 * 365}
+
+@st.fragment
+@instrument.rerun_scope("live.historySection")
+def historySection():
+    st.subheader("Stored Intraday History")
+    selected_range = st.selectbox("Range", options = list(history_ranges), index = 1, key = 'live_history_range')
+    end = pd.Timestamp.now(tz = "America/New_York")
+    start = end - pd.Timedelta(days = history_ranges[selected_range])
+    resolution, history = st.session_state['live_session'].bar_store.resample(live_ticker, start, end)
+    if not len(history):
+        st.info(f"No stored bars for {live_ticker} in this range yet; bars are stored while this page is open.")
+        return
+    fig_history = go.Figure(charts.line_trace(history['Close'], "Close", "#17becf", aggregate = False))
+    fig_history.update_layout(
+        xaxis_title = "Time",
+        yaxis_title = "Price",
+        title = f"{live_ticker} Close, {selected_range} ({resolution} bars)",
+        title_x = 0.35
+    )
+    charts.plot(fig_history, "fig_live_history")
+
+historySection()
+
+st.write(":blue[Note:] Bars are appended as they complete; indicators are updated per bar, not recomputed.")
+
+instrument.end_rerun()
+instrument.sidebar_panel()
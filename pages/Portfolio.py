@@ -0,0 +1,167 @@
+import pandas as pd
+import numpy as np
+import streamlit as st
+import _datetime # type: ignore
+import plotly.graph_objects as go
+from stocksight import analytics, charts, framecache, instrument, portfolio, reference
+from stocksight.graph import Graph
+
+
+
+#pandas copy-on-write: shared cached frames are handed out as shallow copies (see stocksight/framecache.py)
+framecache.enable_copy_on_write()
+
+st.set_page_config(
+    page_title="Portfolio",
+    page_icon="💼"
+
+)
+
+
+
+main_bg= f"""
+<style>
+[data-testid="stAppViewContainer"] {{
+
+background-image: url(https://static.vecteezy.com/system/resources/previews/002/816/559/non_2x/abstract-blue-technology-diagonal-geometric-design-background-with-light-effect-free-vector.jpg);
+background-size: cover;
+}}
+[data-testid="stHeader"] {{
+background-color: rgba(0, 0, 0, 0);
+}}
+[data-testid="stSidebar"] {{
+background-image: url(https://static.vecteezy.com/system/resources/previews/002/816/559/non_2x/abstract-blue-technology-diagonal-geometric-design-background-with-light-effect-free-vector.jpg);
+background-position: center;
+}}
+</style>
+"""
+
+st.markdown(main_bg, unsafe_allow_html=True)
+
+instrument.setup()
+instrument.begin_rerun("portfolio")
+
+
+st.sidebar.success("Select Page")
+
+
+st.title('Portfolio')
+st.subheader("Covariance-based Risk and the Efficient Frontier")
+start = st.date_input("Start Date: ", _datetime.datetime.today() - _datetime.timedelta(days = 366))
+end = st.date_input("End Date: ", _datetime.datetime.today())
+holdings_text = st.text_area("Holdings (one 'TICKER weight' per line; weights are normalized)", "AAPL 0.4\nMSFT 0.3\nNVDA 0.3")
+
+try:
+    weights = portfolio.normalize_weights(portfolio.parse_holdings(holdings_text))
+except ValueError as e:
+    st.error(f"Could not read holdings: {str(e)}")
+    st.stop()
+
+#Same memoized graph as the Charts page: editing weights does not refetch prices
+if 'portfolio_graph_memo' not in st.session_state:
+    st.session_state['portfolio_graph_memo'] = {}
+graph = Graph(st.session_state['portfolio_graph_memo'], shared = framecache.default_cache())
+graph.param('tickers', tuple(sorted(weights.index)))
+graph.param('weights', weights.sort_index())
+graph.param('start', start)
+graph.param('end', end)
+
+#Aligned log-return matrix, built once per ticker set and date range
+@graph.node('returns', inputs = ['tickers', 'start', 'end'])
+def get_returns(tickers, start, end):
+    return portfolio.return_matrix(list(tickers), start, end)
+
+@graph.node('bench_log', inputs = ['start', 'end'])
+def get_bench_log(start, end):
+    return analytics.log_returns(reference.default_store().benchmark(start, end)['Adj Close'])
+
+@graph.node('rates_df', inputs = ['start', 'end'], shared = False)
+def get_rfr(start, end):
+    return reference.default_store().risk_free(start, end)
+
+@graph.node('analysis', inputs = ['returns', 'weights', 'bench_log', 'rates_df'])
+def get_analysis(returns, weights, bench_log, rates_df):
+    return portfolio.analyze(returns, weights, bench_log, rates_df['Daily_rfr'])
+
+@graph.node('moments', inputs = ['returns'])
+def get_moments(returns):
+    return portfolio.moments(returns)
+
+@graph.node('frontier', inputs = ['moments', 'long_only'])
+def get_frontier(moments, long_only):
+    return portfolio.frontier(*moments, n_points = 60, long_only = long_only)
+
+
+try:
+    returns = graph.get('returns')
+except Exception as e:
+    st.error(f"Could not download prices: {str(e)}")
+    st.stop()
+if len(returns) < 3:
+    st.warning("Not enough overlapping price history for these holdings in the selected range.")
+    st.stop()
+
+summary, holdings, port = graph.get('analysis')
+days = analytics.TRADING_DAYS
+
+st.subheader(f'Displays data from {start.strftime("%B %d, %Y")} to {end.strftime("%B %d, %Y")} ({len(returns)} common trading days)')
+col1, col2, col3 = st.columns(3)
+col1.metric("Expected Return (annualized)", f"{summary['expected_return'] * days * 100:.2f}%")
+col2.metric("Volatility (annualized)", f"{summary['volatility'] * np.sqrt(days) * 100:.2f}%")
+col3.metric("Beta vs S&P 500", f"{summary['beta']:.3f}")
+col1.metric("Alpha (daily)", f"{summary['alpha']:.6f}")
+col2.metric("Sharpe Ratio (daily)", f"{summary['sharpe']:.4f}")
+col3.metric("Maximum Drawdown", f"{summary['max_drawdown']:.2f}%")
+
+st.write("Holdings:")
+st.dataframe(holdings.sort_values('risk_contribution', ascending = False))
+
+
+#Growth of the portfolio with its running peak
+growth, peak, _ = analytics.drawdown_matrix(port.to_numpy())
+fig_growth = go.Figure()
+fig_growth.add_trace(charts.line_trace(pd.Series(growth[:, 0] * 100, index = port.index), "Portfolio Value (%)", "#17becf"))
+fig_growth.add_trace(charts.line_trace(pd.Series(peak[:, 0] * 100, index = port.index), "Cumulative Max (Peak)", "#d62728"))
+fig_growth.update_layout(
+    xaxis_title = "Time",
+    yaxis_title = "Value (%)",
+    title = "Portfolio Compound Returns (%) and Peak",
+    title_x = 0.25
+)
+charts.plot(fig_growth, "fig_portfolio_growth")
+
+
+#EFFICIENT FRONTIER (runs as a fragment: switching long-only only reruns this section)
+@st.fragment
+@instrument.rerun_scope("portfolio.frontierSection")
+def frontierSection():
+    st.subheader("Efficient Frontier")
+    long_only = st.toggle("Long only", True, key = 'frontier_long_only')
+    graph.param('long_only', long_only)
+    W, frontier_ret, frontier_vol = graph.get('frontier')
+    mu, cov = graph.get('moments')
+
+    fig_frontier = go.Figure()
+    fig_frontier.add_trace(go.Scatter(x = frontier_vol * np.sqrt(days) * 100, y = frontier_ret * days * 100,
+                                      mode = "lines+markers", name = "Efficient Frontier", line = dict(color = "#17becf")))
+    fig_frontier.add_trace(go.Scatter(x = np.sqrt(np.diag(cov) * days) * 100, y = mu * days * 100, mode = "markers",
+                                      text = list(returns.columns), name = "Holdings", marker = dict(color = "#7f7f7f")))
+    fig_frontier.add_trace(go.Scatter(x = [summary['volatility'] * np.sqrt(days) * 100], y = [summary['expected_return'] * days * 100],
+                                      mode = "markers", name = "Portfolio", marker = dict(color = "#d62728", size = 12)))
+    fig_frontier.update_layout(
+        xaxis_title = "Volatility (annualized, %)",
+        yaxis_title = "Expected Return (annualized, %)",
+        title = "Efficient Frontier",
+        title_x = 0.4
+    )
+    charts.plot(fig_frontier, "fig_frontier")
+
+    min_var = pd.Series(W[int(np.argmin(frontier_vol))], index = returns.columns, name = "weight")
+    st.write("Minimum-variance weights:")
+    st.dataframe(min_var[min_var.abs() > 1e-4].sort_values(ascending = False))
+
+frontierSection()
+st.write(":blue[Note:] Expected returns and covariances are estimated from the selected period; they are not forecasts.")
+
+instrument.end_rerun()
+instrument.sidebar_panel()
@@ -0,0 +1 @@
+"""Data access and analytics helpers shared by the StockSight pages."""
@@ -0,0 +1,115 @@
+"""Vectorized risk/return metrics for many tickers at once.
+
+Everything works on a (dates x tickers) matrix of log returns plus a shared
+benchmark and daily risk-free series on the same dates. Missing values are
+masked per ticker, so names with shorter histories can sit in the same matrix.
+Sample statistics use ddof=1 throughout.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+METRIC_COLUMNS = ["volatility", "max_drawdown", "max_drawdown_date", "beta", "alpha",
+                  "sharpe", "capm_return", "observations"]
+
+
+def log_returns(prices):
+    """Log returns of a price Series/DataFrame/array; the first row is NaN."""
+    if isinstance(prices, (pd.Series, pd.DataFrame)):
+        return np.log(prices / prices.shift(1))
+    prices = np.asarray(prices, dtype="float64")
+    out = np.full(prices.shape, np.nan)
+    out[1:] = np.log(prices[1:] / prices[:-1])
+    return out
+
+
+def daily_from_annual(annual_rate, periods=TRADING_DAYS):
+    """De-annualize a rate quoted as a fraction (e.g. ^IRX / 100)."""
+    return (1 + annual_rate) ** (1 / periods) - 1
+
+
+def align(returns, benchmark, rfr):
+    """Inner-join returns, benchmark and risk-free series on their dates.
+
+    Returns (returns DataFrame, benchmark ndarray, rfr ndarray).
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    frame = returns.join(benchmark.rename("__bench__"), how="inner").join(rfr.rename("__rfr__"), how="inner")
+    bench = frame.pop("__bench__").to_numpy(dtype="float64")
+    rf = frame.pop("__rfr__").to_numpy(dtype="float64")
+    return frame, bench, rf
+
+
+def _masked_mean(x, mask, n):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(mask, x, 0.0).sum(axis=0) / n
+
+
+def drawdown_matrix(returns):
+    """Cumulative growth, running peak and drawdown (fraction) for each column."""
+    r = np.nan_to_num(np.asarray(returns, dtype="float64"), nan=0.0)
+    growth = np.exp(np.cumsum(r, axis=0))
+    peak = np.maximum.accumulate(growth, axis=0)
+    return growth, peak, (peak - growth) / peak
+
+
+def compute_metrics(returns, benchmark, rfr, index=None, tickers=None):
+    """All per-ticker metrics in one pass.
+
+    returns: (T, N) log returns; benchmark and rfr: (T,) daily series on the
+    same dates. Pandas inputs are aligned on their index first. Returns a
+    DataFrame indexed by ticker with METRIC_COLUMNS.
+    """
+    if isinstance(returns, (pd.Series, pd.DataFrame)):
+        frame, bench, rf = align(returns, benchmark, rfr)
+        index, tickers = frame.index, frame.columns
+        r = frame.to_numpy(dtype="float64")
+    else:
+        r = np.asarray(returns, dtype="float64")
+        if r.ndim == 1:
+            r = r[:, None]
+        bench = np.asarray(benchmark, dtype="float64")
+        rf = np.asarray(rfr, dtype="float64")
+    if tickers is None:
+        tickers = range(r.shape[1])
+    if index is None:
+        index = np.arange(r.shape[0])
+
+    mask = ~np.isnan(r) & ~np.isnan(bench)[:, None] & ~np.isnan(rf)[:, None]
+    n = mask.sum(axis=0)
+    b = np.broadcast_to(bench[:, None], r.shape)
+    f = np.broadcast_to(rf[:, None], r.shape)
+
+    mean_r = _masked_mean(r, mask, n)
+    mean_b = _masked_mean(b, mask, n)
+    mean_f = _masked_mean(f, mask, n)
+    dr = np.where(mask, r - mean_r, 0.0)
+    db = np.where(mask, b - mean_b, 0.0)
+    ex = np.where(mask, r - f, 0.0)
+    mean_ex = mean_r - mean_f
+    dex = np.where(mask, ex - mean_ex, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_r = (dr ** 2).sum(axis=0) / (n - 1)
+        var_b = (db ** 2).sum(axis=0) / (n - 1)
+        cov = (dr * db).sum(axis=0) / (n - 1)
+        beta = cov / var_b
+        capm = mean_f + beta * (mean_b - mean_f)
+        alpha = mean_r - capm
+        sharpe = mean_ex / np.sqrt((dex ** 2).sum(axis=0) / (n - 1))
+
+    _, _, dd = drawdown_matrix(np.where(mask, r, 0.0))
+    worst = dd.argmax(axis=0)
+
+    return pd.DataFrame({
+        "volatility": np.sqrt(var_r),
+        "max_drawdown": dd[worst, np.arange(r.shape[1])] * 100,
+        "max_drawdown_date": np.asarray(index)[worst],
+        "beta": beta,
+        "alpha": alpha,
+        "sharpe": sharpe,
+        "capm_return": capm,
+        "observations": n,
+    }, index=pd.Index(tickers, name="ticker"))
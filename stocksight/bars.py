@@ -0,0 +1,182 @@
+"""Memory-mapped multi-resolution bar store for intraday history.
+
+Each feed has its own tree, and each ticker has one flat binary file per
+resolution under `<cache>/bars/<feed>/<resolution>/<TICKER>.bars`, so
+replayed or synthetic sessions never mix with real bars. A file holds
+fixed-size records of (UTC ns timestamp, open, high, low, close, volume).
+Reads go through `np.memmap`, so every session and process reading a
+ticker shares the same OS page-cache pages instead of holding its own
+DataFrame. A read builds only the requested slice, which is located by
+binary search on the timestamps.
+
+1-minute bars are append-only: bars at or before the last stored minute
+are ignored. The 1-minute file is the source of truth. After each append,
+the 5m/1h/1d/1w rollups rebuild their last bucket, and anything after it,
+from the 1-minute records, so a rollup left behind by an interrupted write
+catches up on the next append. Day and week buckets follow New York
+calendar days (weeks start on Monday). One writer per ticker is assumed;
+in-process writers are serialized by a per-ticker lock.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from stocksight import charts, instrument
+from stocksight.prices import CACHE_DIR
+from stocksight.reference import MARKET_TZ
+
+BAR_DTYPE = np.dtype([("ts", "<i8"), ("Open", "<f8"), ("High", "<f8"), ("Low", "<f8"),
+                      ("Close", "<f8"), ("Volume", "<f8")])
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# finest first; bars per regular trading day, used to estimate range sizes
+RESOLUTIONS = {"1m": 390, "5m": 78, "1h": 7, "1d": 1, "1w": 0.2}
+ROLLUP_FREQ = {"5m": "5min", "1h": "h", "1d": "D", "1w": "W-MON"}
+
+
+def _bucket_starts(ts, resolution):
+    """UTC ns start of each timestamp's `resolution` bucket (New York wall clock)."""
+    local = pd.DatetimeIndex(ts.astype("datetime64[ns]")).tz_localize("UTC").tz_convert(MARKET_TZ)
+    if resolution == "1w":
+        start = local.normalize() - pd.to_timedelta(local.dayofweek, unit="D")
+    else:
+        start = local.floor(ROLLUP_FREQ[resolution], ambiguous=False, nonexistent="shift_forward")
+    return start.tz_convert("UTC").tz_localize(None).as_unit("ns").asi8
+
+
+def _aggregate(records, buckets):
+    """One record per run of equal bucket values (records are time-ordered)."""
+    edges = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [len(records)])) - 1
+    out = np.empty(len(starts), dtype=BAR_DTYPE)
+    out["ts"] = buckets[starts]
+    out["Open"] = records["Open"][starts]
+    out["High"] = np.maximum.reduceat(records["High"], starts)
+    out["Low"] = np.minimum.reduceat(records["Low"], starts)
+    out["Close"] = records["Close"][ends]
+    out["Volume"] = np.add.reduceat(records["Volume"], starts)
+    return out
+
+
+class BarStore:
+    def __init__(self, feed="yahoo", root=CACHE_DIR):
+        self.feed = feed
+        self.root = os.path.join(root, "bars", feed)
+        self._locks = {}
+        self._maps = {}                    # (ticker, resolution) -> (file size, memmap)
+        self._lock = threading.Lock()
+
+    def path(self, ticker, resolution):
+        return os.path.join(self.root, resolution, f"{ticker.upper()}.bars")
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _records(self, ticker, resolution):
+        """Read-only memmap of a file, reopened only when the file has grown."""
+        path = self.path(ticker, resolution)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        key = (ticker.upper(), resolution)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] == size:
+                return cached[1]
+            # a torn record left by an interrupted write is ignored (and overwritten by the next one)
+            count = size // BAR_DTYPE.itemsize
+            records = (np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,)) if count
+                       else np.empty(0, dtype=BAR_DTYPE))
+            self._maps[key] = (size, records)
+            return records
+
+    def append(self, ticker, bars):
+        """Add 1-minute `bars` (DatetimeIndex, BAR_COLUMNS); returns the number stored."""
+        if not len(bars):
+            return 0
+        index = bars.index if bars.index.tz is not None else bars.index.tz_localize(MARKET_TZ)
+        new = np.empty(len(bars), dtype=BAR_DTYPE)
+        new["ts"] = index.tz_convert("UTC").tz_localize(None).as_unit("ns").asi8
+        for column in BAR_COLUMNS:
+            new[column] = bars[column].to_numpy(dtype="float64")
+        new = new[np.argsort(new["ts"], kind="stable")]
+
+        with self._ticker_lock(ticker):
+            minutes = self._records(ticker, "1m")
+            if len(minutes):
+                new = new[new["ts"] > minutes["ts"][-1]]
+            if not len(new):
+                return 0
+            with instrument.span("compute", "bars.append", ticker=ticker, bars=len(new)):
+                self._write(ticker, "1m", new, len(minutes))
+                for resolution in ROLLUP_FREQ:
+                    self._roll_up(ticker, resolution)
+        return len(new)
+
+    def _roll_up(self, ticker, resolution):
+        """Rebuild the rollup from its last (possibly open or stale) bucket onwards."""
+        minutes = self._records(ticker, "1m")
+        existing = self._records(ticker, resolution)
+        keep = max(len(existing) - 1, 0)
+        since = existing["ts"][keep] if len(existing) else minutes["ts"][0]
+        tail = minutes[np.searchsorted(minutes["ts"], since, "left"):]
+        if not len(tail):
+            return
+        self._write(ticker, resolution, _aggregate(tail, _bucket_starts(tail["ts"], resolution)), keep)
+
+    def _write(self, ticker, resolution, records, offset):
+        """Write `records` starting at record `offset`, dropping anything after them."""
+        path = self.path(ticker, resolution)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset * BAR_DTYPE.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, ticker, start=None, end=None, resolution="1m"):
+        """Bars in [start, end) at `resolution`, indexed in New York time."""
+        records = self._records(ticker, resolution)
+        ts = records["ts"]
+        lo = np.searchsorted(ts, self._ns(start), "left") if start is not None else 0
+        hi = np.searchsorted(ts, self._ns(end), "left") if end is not None else len(ts)
+        chunk = records[lo:hi]
+        instrument.count("bars", hit=bool(len(chunk)))
+        index = pd.DatetimeIndex(chunk["ts"].astype("datetime64[ns]"), name="Datetime")
+        return pd.DataFrame({c: chunk[c] for c in BAR_COLUMNS},
+                            index=index.tz_localize("UTC").tz_convert(MARKET_TZ))
+
+    @staticmethod
+    def _ns(value):
+        value = pd.Timestamp(value)
+        value = value.tz_localize(MARKET_TZ) if value.tzinfo is None else value
+        return value.tz_convert("UTC").tz_localize(None).value
+
+    def resample(self, ticker, start, end, max_points=charts.POINT_BUDGET):
+        """(resolution, bars) for the finest stored resolution fitting `max_points`."""
+        resolution = pick_resolution(start, end, max_points)
+        return resolution, self.read(ticker, start, end, resolution)
+
+
+def pick_resolution(start, end, max_points=charts.POINT_BUDGET):
+    """Finest resolution whose estimated bar count over [start, end) is within `max_points`."""
+    days = max(int(np.busday_count(pd.Timestamp(start).date(), pd.Timestamp(end).date())), 1)
+    for resolution, per_day in RESOLUTIONS.items():
+        if days * per_day <= max_points:
+            return resolution
+    return "1w"
+
+
+_default_stores = {}
+_default_lock = threading.Lock()
+
+
+def default_store(feed="yahoo"):
+    """Process-wide store for bars from `feed` (see `live.Feed.name`)."""
+    with _default_lock:
+        if feed not in _default_stores:
+            _default_stores[feed] = BarStore(feed)
+        return _default_stores[feed]
@@ -0,0 +1,126 @@
+"""Headless batch precomputation of the dashboard metrics for a ticker universe.
+
+    python -m stocksight.batch AAPL MSFT NVDA
+    python -m stocksight.batch --file universe.txt --workers 8 --sentiment
+
+Tickers are split into chunks and each chunk runs in a worker process:
+prices come from the shared Parquet cache, metrics are computed in one
+vectorized pass per chunk against ^GSPC and ^IRX (loaded once by the parent
+and handed to every worker), and headline sentiment is optionally added.
+The result is one Parquet file per date range under `<cache>/precomputed/`,
+which the pages read through `read_metrics`.
+
+The default range matches the pages' default view (the last 366 days), so a
+nightly run answers the common case without any computation on click.
+"""
+import argparse
+import datetime
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stocksight import analytics, prices, reference
+from stocksight.prices import CACHE_DIR
+
+PRECOMPUTED_DIR = os.path.join(CACHE_DIR, "precomputed")
+CHUNK_SIZE = 25
+
+
+def _day(value):
+    return pd.Timestamp(value).date().isoformat()
+
+
+def metrics_path(start, end, root=PRECOMPUTED_DIR):
+    return os.path.join(root, f"metrics_{_day(start)}_{_day(end)}.parquet")
+
+
+def compute_chunk(tickers, start, end, bench, rfr, with_sentiment=False):
+    """Metrics for a group of tickers against benchmark log returns and daily rfr (runs inside a worker process)."""
+    store = prices.default_store()
+    closes = {}
+    for t in tickers:
+        try:
+            data = store.get(t, start, end)
+        except Exception as e:
+            logging.error(f"error downloading {t}: {str(e)}")
+            continue
+        if len(data):
+            closes[t] = data["Adj Close"]
+    if not closes:
+        return pd.DataFrame(columns=analytics.METRIC_COLUMNS)
+    returns = analytics.log_returns(pd.DataFrame(closes))
+    metrics = analytics.compute_metrics(returns, bench, rfr)
+    if with_sentiment:
+        metrics["news_sentiment"] = [_news_sentiment(t) for t in metrics.index]
+    return metrics
+
+
+def _news_sentiment(ticker):
+    from stocksight import news, sentiment
+
+    try:
+        titles = [row[2] for row in news.default_fetcher().headlines(ticker)]
+    except Exception as e:
+        logging.error(f"error fetching headlines for {ticker}: {str(e)}")
+        return np.nan
+    return float(np.mean(sentiment.default_service().score(titles))) if titles else np.nan
+
+
+def run(tickers, start, end, workers=None, with_sentiment=False, root=PRECOMPUTED_DIR):
+    """Compute and write metrics for `tickers`; returns the written frame."""
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    # the reference series are loaded once here; workers never touch ^GSPC or ^IRX
+    refs = reference.ReferenceStore(prices.default_store())
+    bench = analytics.log_returns(refs.benchmark(start, end)["Adj Close"])
+    rfr = refs.risk_free(start, end)["Daily_rfr"]
+    chunks = [tickers[i:i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    n = len(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(compute_chunk, chunks, [start] * n, [end] * n, [bench] * n, [rfr] * n,
+                              [with_sentiment] * n))
+    metrics = pd.concat(parts) if parts else pd.DataFrame(columns=analytics.METRIC_COLUMNS)
+    metrics["computed_at"] = pd.Timestamp.now(tz="UTC")
+    os.makedirs(root, exist_ok=True)
+    path = metrics_path(start, end, root)
+    prices._replace(path, metrics.to_parquet)
+    return metrics
+
+
+def read_metrics(ticker, start, end, root=PRECOMPUTED_DIR):
+    """Precomputed metrics row for `ticker` over exactly [start, end), or None."""
+    path = metrics_path(start, end, root)
+    if not os.path.exists(path):
+        return None
+    metrics = pd.read_parquet(path)
+    ticker = ticker.upper()
+    return metrics.loc[ticker] if ticker in metrics.index else None
+
+
+def main(argv=None):
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(description="Precompute StockSight metrics for a ticker universe.")
+    parser.add_argument("tickers", nargs="*", help="ticker symbols")
+    parser.add_argument("--file", help="file with one ticker per line")
+    parser.add_argument("--start", default=(today - datetime.timedelta(days=366)).isoformat())
+    parser.add_argument("--end", default=today.isoformat())
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--sentiment", action="store_true", help="also score current finviz headlines")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.split("#")[0].strip() for line in f]
+    if not any(t.strip() for t in tickers):
+        parser.error("no tickers given")
+    metrics = run(tickers, args.start, args.end, args.workers, args.sentiment)
+    print(f"wrote {len(metrics)} tickers to {metrics_path(args.start, args.end)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Block-bootstrap confidence intervals for Sharpe, beta, alpha and volatility.
+
+Resamples are drawn as whole (resamples x days) index matrices using a
+circular moving-block bootstrap, which keeps the short-range dependence of
+daily returns. Stock, benchmark and risk-free returns are resampled with the
+same indices, so every metric of a resample comes from the same days. Each
+batch of resamples is reduced with the same formulas as
+`analytics.compute_metrics` (ddof=1). Large jobs are split into seeded
+chunks and run on the shared worker pool, and results do not depend on the
+number of workers.
+"""
+import numpy as np
+import pandas as pd
+
+from stocksight import instrument
+from stocksight import workers as worker_pool
+
+BOOT_METRICS = ["sharpe", "beta", "alpha", "volatility"]
+
+# resamples x days above which the work goes to a process pool
+POOL_THRESHOLD = 2_000_000
+CHUNK_RESAMPLES = 250
+# cap on the size of one index matrix, in elements
+BATCH_ELEMENTS = 1_000_000
+
+
+def default_block(n_days):
+    """Block length ~ n^(1/3), the usual rate for moving-block bootstraps."""
+    return max(1, int(round(n_days ** (1 / 3))))
+
+
+def block_indices(n_days, n_resamples, block, rng):
+    """(n_resamples, n_days) row indices built from circular blocks of length `block`."""
+    n_blocks = -(-n_days // block)
+    starts = rng.integers(0, n_days, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)) % n_days
+    return idx.reshape(n_resamples, -1)[:, :n_days]
+
+
+def batch_metrics(r, b, f):
+    """Metrics of each row of (resamples, days) stock, benchmark and risk-free returns."""
+    n = r.shape[-1]
+    mean_r, mean_b, mean_f = r.mean(axis=-1), b.mean(axis=-1), f.mean(axis=-1)
+    dr = r - mean_r[..., None]
+    db = b - mean_b[..., None]
+    ex = r - f
+    dex = ex - ex.mean(axis=-1)[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_r = (dr * dr).sum(axis=-1) / (n - 1)
+        beta = (dr * db).sum(axis=-1) / (db * db).sum(axis=-1)
+        alpha = mean_r - (mean_f + beta * (mean_b - mean_f))
+        sharpe = (mean_r - mean_f) / np.sqrt((dex * dex).sum(axis=-1) / (n - 1))
+    return np.stack([sharpe, beta, alpha, np.sqrt(var_r)], axis=-1)
+
+
+def resample_chunk(r, b, f, n_resamples, block, seed):
+    """Metrics for `n_resamples` resamples; also the process-pool work unit."""
+    rng = np.random.default_rng(seed)
+    step = max(1, BATCH_ELEMENTS // len(r))
+    out = []
+    for i in range(0, n_resamples, step):
+        idx = block_indices(len(r), min(step, n_resamples - i), block, rng)
+        out.append(batch_metrics(r[idx], b[idx], f[idx]))
+    return np.concatenate(out) if out else np.empty((0, len(BOOT_METRICS)))
+
+
+def _aligned(stock, bench, rfr):
+    if isinstance(stock, pd.Series):
+        frame = pd.concat([stock.rename("r"), bench.rename("b"), rfr.rename("f")], axis=1, join="inner")
+        frame = frame.dropna()
+        return frame["r"].to_numpy(), frame["b"].to_numpy(), frame["f"].to_numpy()
+    r, b, f = (np.asarray(a, dtype="float64") for a in (stock, bench, rfr))
+    keep = ~(np.isnan(r) | np.isnan(b) | np.isnan(f))
+    return r[keep], b[keep], f[keep]
+
+
+def confidence_intervals(stock, bench, rfr, n_resamples=2000, level=0.95, block=None,
+                         seed=0, workers=None):
+    """Percentile intervals for BOOT_METRICS.
+
+    stock, bench, rfr: daily log returns and daily risk-free rate (Series
+    are inner-joined on dates; NaN rows are dropped). Returns a DataFrame
+    indexed by metric with estimate, lower, upper and std_error.
+    """
+    r, b, f = _aligned(stock, bench, rfr)
+    if len(r) < 3:
+        return pd.DataFrame(np.nan, index=pd.Index(BOOT_METRICS, name="metric"),
+                            columns=["estimate", "lower", "upper", "std_error"])
+    block = block or default_block(len(r))
+    sizes = [min(CHUNK_RESAMPLES, n_resamples - i) for i in range(0, n_resamples, CHUNK_RESAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with instrument.span("compute", "bootstrap", resamples=n_resamples, days=len(r)):
+        if n_resamples * len(r) < POOL_THRESHOLD or len(sizes) == 1:
+            parts = [resample_chunk(r, b, f, n, block, s) for n, s in zip(sizes, seeds)]
+        else:
+            parts = worker_pool.map(resample_chunk, [r] * len(sizes), [b] * len(sizes), [f] * len(sizes),
+                                    sizes, [block] * len(sizes), seeds, max_workers=workers)
+        draws = np.concatenate(parts)
+
+    tail = (1 - level) / 2 * 100
+    lower, upper = np.nanpercentile(draws, [tail, 100 - tail], axis=0)
+    return pd.DataFrame({
+        "estimate": batch_metrics(r, b, f),
+        "lower": lower,
+        "upper": upper,
+        "std_error": np.nanstd(draws, axis=0, ddof=1),
+    }, index=pd.Index(BOOT_METRICS, name="metric"))
@@ -0,0 +1,105 @@
+"""Point-budgeted chart data for long price histories.
+
+When the selected range is long, series are first reduced to each week's
+or month's lowest and highest observation, so intramonth troughs and spikes
+survive. They are then reduced with Largest-Triangle-Three-Buckets (LTTB),
+which keeps the visual shape (peaks, troughs, crashes) of the line. Traces that
+still carry many points are drawn with WebGL (`Scattergl`) instead of SVG.
+
+Plotly zooms in the browser, so the aggregation level follows the selected
+date range rather than the zoom level.
+"""
+import numpy as np
+import pandas as pd
+
+from stocksight import instrument
+
+POINT_BUDGET = 2000
+GL_THRESHOLD = 1000
+
+WEEKLY_AFTER = pd.Timedelta(days=5 * 365)
+MONTHLY_AFTER = pd.Timedelta(days=20 * 365)
+
+
+def lttb(x, y, n_out):
+    """Indices of the `n_out` points LTTB keeps from (x, y); x must be increasing."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # n-2 interior points spread over n_out-2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_buckets(y, buckets):
+    """Indices of each bucket's min and max, plus the first and last point, in order.
+
+    `buckets` gives a non-decreasing bucket id for every point of `y`.
+    """
+    y = np.asarray(y, dtype="float64")
+    buckets = np.asarray(buckets)
+    if not len(y):
+        return np.arange(0)
+    # sorted by bucket, then value: each bucket's first entry is its min and its last entry its max
+    order = np.lexsort((y, buckets))
+    sorted_ids = buckets[order]
+    first = np.flatnonzero(np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1])))
+    last = np.concatenate((first[1:], [len(y)])) - 1
+    return np.unique(np.concatenate((order[first], order[last], [0, len(y) - 1])))
+
+
+def aggregation_period(index):
+    """'M' (month), 'W-FRI' or None for daily, from the span of the index."""
+    if len(index) < 2:
+        return None
+    span = index[-1] - index[0]
+    if span > MONTHLY_AFTER:
+        return "M"
+    if span > WEEKLY_AFTER:
+        return "W-FRI"
+    return None
+
+
+def prepare_series(series, max_points=POINT_BUDGET, aggregate=True):
+    """Series reduced to at most `max_points`, keeping its overall shape."""
+    series = series.dropna()
+    if aggregate and isinstance(series.index, pd.DatetimeIndex):
+        period = aggregation_period(series.index)
+        if period is not None and len(series) > max_points:
+            index = series.index.tz_localize(None) if series.index.tz is not None else series.index
+            series = series.iloc[minmax_buckets(series.to_numpy(), index.to_period(period).asi8)]
+    if max_points and len(series) > max_points:
+        x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+        series = series.iloc[lttb(x, series.to_numpy(), max_points)]
+    return series
+
+
+def plot(fig, name):
+    """`st.plotly_chart` timed as a render span (serialization happens here)."""
+    import streamlit as st
+
+    with instrument.span("render", name):
+        st.plotly_chart(fig)
+
+
+def line_trace(series, name, color=None, max_points=POINT_BUDGET, aggregate=True):
+    """A Plotly line trace for `series`, downsampled and switched to WebGL when large."""
+    import plotly.graph_objects as go
+
+    data = prepare_series(series, max_points, aggregate)
+    trace = go.Scattergl if len(data) > GL_THRESHOLD else go.Scatter
+    return trace(x=data.index, y=data.to_numpy(), mode="lines", name=name,
+                 line=dict(color=color) if color else None)
@@ -0,0 +1,95 @@
+"""Drawdown episodes for many tickers at once.
+
+An episode starts on the first day below the running peak and ends on the
+first day back at (or above) it. Runs are found on the flattened
+column-major drawdown matrix, so the work is a fixed number of O(T * N)
+array passes however many episodes there are. Each episode gets its depth
+with `np.maximum.reduceat` and its trough with `np.minimum.reduceat` over the
+positions that reach that depth. The input returns are only read, never
+copied into or extended with helper columns.
+"""
+import numpy as np
+import pandas as pd
+
+from stocksight import analytics
+
+EPISODE_COLUMNS = ["ticker", "peak", "trough", "recovery", "depth",
+                   "decline_days", "recovery_days", "duration_days"]
+
+
+def episodes(returns, index=None, tickers=None, top=None):
+    """Every drawdown episode of each column of `returns` (log returns).
+
+    Returns a DataFrame with EPISODE_COLUMNS: peak/trough/recovery dates
+    (recovery is NaT while still under water), depth in percent of the peak,
+    and the peak-to-trough, trough-to-recovery and peak-to-recovery lengths
+    in trading days (the last two measured to the final row when unrecovered).
+    With `top`, only each ticker's `top` deepest episodes are kept.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        index = returns.index if index is None else index
+        tickers = returns.columns if tickers is None else tickers
+    r = np.asarray(returns, dtype="float64")
+    if r.ndim == 1:
+        r = r[:, None]
+    T, N = r.shape
+    index = np.asarray(index if index is not None else np.arange(T))
+    tickers = np.asarray(tickers if tickers is not None else range(N))
+
+    _, _, dd = analytics.drawdown_matrix(r)
+    flat = dd.ravel(order="F")
+    under = flat > 0
+    row = np.tile(np.arange(T), N)
+    prev = np.concatenate(([False], under[:-1])) & (row != 0)
+    nxt = np.concatenate((under[1:], [False])) & (row != T - 1)
+    starts = np.flatnonzero(under & ~prev)
+    ends = np.flatnonzero(under & ~nxt)          # last day under water (inclusive)
+    if not len(starts):
+        # typed like a non-empty result so callers can sort or nlargest on it
+        none = np.empty(0, dtype="int64")
+        dates = index[:0]
+        return pd.DataFrame({
+            "ticker": tickers[:0], "peak": dates, "trough": dates,
+            "recovery": dates if np.issubdtype(dates.dtype, np.datetime64) else dates.astype("float64"),
+            "depth": np.empty(0), "decline_days": none, "recovery_days": none, "duration_days": none,
+        })
+
+    depth = np.maximum.reduceat(flat, starts)
+    episode = np.cumsum(under & ~prev) - 1
+    pos = np.arange(flat.size)
+    at_depth = under & (flat == depth[np.clip(episode, 0, None)])
+    trough = np.minimum.reduceat(np.where(at_depth, pos, flat.size), starts)
+
+    col = starts // T
+    peak_row = row[starts] - 1
+    trough_row = row[trough]
+    end_row = row[ends]
+    recovered = end_row < T - 1
+    recovery_row = np.where(recovered, end_row + 1, T - 1)
+
+    dates = np.asarray(index)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        recovery = np.where(recovered, dates[recovery_row], np.datetime64("NaT"))
+    else:
+        recovery = np.where(recovered, dates[recovery_row].astype("float64"), np.nan)
+    out = pd.DataFrame({
+        "ticker": tickers[col],
+        "peak": dates[peak_row],
+        "trough": dates[trough_row],
+        "recovery": recovery,
+        "depth": depth * 100,
+        "decline_days": trough_row - peak_row,
+        "recovery_days": recovery_row - trough_row,
+        "duration_days": recovery_row - peak_row,
+    })
+    if top is not None:
+        out = out.sort_values(["ticker", "depth"], ascending=[True, False], kind="stable")
+        out = out.groupby("ticker", sort=False).head(top)
+    return out.reset_index(drop=True)
+
+
+def top_drawdowns(returns, n=10):
+    """The `n` deepest episodes per ticker, deepest first within each ticker."""
+    return episodes(returns, top=n)
@@ -0,0 +1,227 @@
+"""Process-wide, byte-budgeted LRU for price frames and derived series.
+
+    frame = framecache.default_cache().get_or_compute(key, fn, *args, ttl=300)
+
+Every session and page asking for the same key gets the same underlying
+data. With pandas copy-on-write on (the app enables it at entry with
+`enable_copy_on_write()`; it is always on from pandas 3), callers receive
+shallow copies and arrays are read-only views, so a page that adds a column
+or overwrites values changes only its own copy, never the shared frame.
+Without it, callers get deep copies instead.
+Entries are sized with `memory_usage(deep=True)`. Data reachable from two
+keys is counted under both, which errs towards evicting early. The least
+recently used entries are evicted once the budget
+(STOCKSIGHT_FRAME_CACHE_MB, default 512) is exceeded. Values larger than a
+quarter of the budget are returned but not kept. Concurrent misses for one key are single-flighted. Each
+Streamlit session's references are recorded for `session_usage()`.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stocksight import instrument, singleflight
+
+DEFAULT_BUDGET_MB = 512
+MAX_ENTRY_FRACTION = 0.25
+SESSION_IDLE = 3600     # seconds before an unseen session is dropped from the accounting
+
+
+def nbytes(value):
+    """Approximate in-memory size of a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _pandas_major():
+    return int(pd.__version__.split(".")[0])
+
+
+def copy_on_write():
+    """Whether pandas copies shared data before writing to it."""
+    return _pandas_major() >= 3 or bool(pd.get_option("mode.copy_on_write"))
+
+
+def enable_copy_on_write():
+    """Switch pandas copy-on-write on for the process (a no-op from pandas 3, where it is the only mode).
+
+    This changes pandas semantics globally (chained assignment no longer
+    writes through, `to_numpy()` views are read-only), so it is called once
+    at app entry rather than on import.
+    """
+    if _pandas_major() < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def share(value):
+    """A reference to a cached value that cannot modify it."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not copy_on_write())
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, dict):
+        return {k: share(v) for k, v in value.items()}
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(share(v) for v in value)
+    return value
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+class FrameCache:
+    def __init__(self, budget_bytes=None, clock=time.monotonic):
+        if budget_bytes is None:
+            budget_bytes = int(float(os.environ.get("STOCKSIGHT_FRAME_CACHE_MB", DEFAULT_BUDGET_MB)) * 2 ** 20)
+        self.budget = budget_bytes
+        self.clock = clock
+        self.used = 0
+        self.evictions = 0
+        self._entries = OrderedDict()      # key -> (value, size, expires)
+        self._sessions = {}                # session id -> {"keys": set, "seen": time}
+        self._lock = threading.Lock()
+
+    def _touch_session(self, key):
+        session = _session_id()
+        if session is None:
+            return
+        entry = self._sessions.setdefault(session, {"keys": set(), "seen": 0.0})
+        entry["keys"].add(key)
+        entry["seen"] = self.clock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self.clock():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                instrument.count("frames", hit=False)
+                return default
+            self._entries.move_to_end(key)
+            self._touch_session(key)
+        instrument.count("frames", hit=True)
+        return share(entry[0])
+
+    def put(self, key, value, ttl=None):
+        """Store `value` (unless it is too large for the budget); returns a shared reference."""
+        return share(self._store(key, value, ttl))
+
+    def _store(self, key, value, ttl):
+        size = nbytes(value)
+        if size > self.budget * MAX_ENTRY_FRACTION:
+            return value
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        expires = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, expires)
+            self.used += size
+            self._touch_session(key)
+            while self.used > self.budget and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, fn, *args, ttl=None):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        # one computation per key however many sessions miss at once; each caller gets its own reference
+        return share(singleflight.group().do(("frames", key), self._compute, key, fn, args, ttl))
+
+    def _compute(self, key, fn, args, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+        # the cached object itself: get_or_compute shares it once per caller
+        if entry is not None:
+            return entry[0]
+        return self._store(key, fn(*args), ttl)
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.used -= size
+
+    def invalidate(self, match=None):
+        """Drop every entry, or those whose key satisfies `match(key)`."""
+        with self._lock:
+            for key in [k for k in self._entries if match is None or match(k)]:
+                self._drop(key)
+
+    def session_usage(self):
+        """Per-session view: cached entries referenced, their bytes, and bytes no other session uses."""
+        now = self.clock()
+        with self._lock:
+            for session in [s for s, e in self._sessions.items() if now - e["seen"] > SESSION_IDLE]:
+                del self._sessions[session]
+            live = {s: {k for k in e["keys"] if k in self._entries} for s, e in self._sessions.items()}
+            for session, keys in live.items():
+                self._sessions[session]["keys"] = keys
+            sizes = {k: e[1] for k, e in self._entries.items()}
+            seen = {s: e["seen"] for s, e in self._sessions.items()}
+        users = {}
+        for keys in live.values():
+            for k in keys:
+                users[k] = users.get(k, 0) + 1
+        rows = [{"session": s, "entries": len(keys), "bytes": sum(sizes[k] for k in keys),
+                 "unique_bytes": sum(sizes[k] for k in keys if users[k] == 1),
+                 "idle_seconds": round(now - seen[s], 1)} for s, keys in live.items()]
+        return pd.DataFrame(rows, columns=["session", "entries", "bytes", "unique_bytes", "idle_seconds"])
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "used_bytes": self.used, "budget_bytes": self.budget,
+                    "evictions": self.evictions, "sessions": len(self._sessions)}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FrameCache()
+        return _default_cache
+
+
+def memory_panel():
+    """Sidebar section with the shared cache totals and the per-session accounting."""
+    import streamlit as st
+
+    cache = default_cache()
+    stats = cache.stats()
+    st.sidebar.caption(f"Shared frame cache: {stats['used_bytes'] / 2 ** 20:.1f} of "
+                       f"{stats['budget_bytes'] / 2 ** 20:.0f} MB, {stats['entries']} entries, "
+                       f"{stats['evictions']} evictions")
+    usage = cache.session_usage()
+    if len(usage):
+        usage["this session"] = usage["session"] == _session_id()
+        usage["MB"] = (usage.pop("bytes") / 2 ** 20).round(2)
+        usage["unique MB"] = (usage.pop("unique_bytes") / 2 ** 20).round(2)
+        st.sidebar.dataframe(usage.drop(columns="session"), hide_index=True)
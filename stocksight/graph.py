@@ -0,0 +1,99 @@
+"""Small memoized computation graph for derived series.
+
+Each node declares the params/nodes it depends on. A node's fingerprint is a
+hash of its name and its inputs' fingerprints, so a value is only recomputed
+when something upstream of it actually changed. The memo dict is supplied by
+the caller, typically a per-session dict kept in `st.session_state`, so the
+graph can be rebuilt on every Streamlit rerun while its results survive.
+
+Fingerprints depend only on inputs, so they are the same in every session.
+With a `shared` frame cache, a node computed by one session is reused
+(read-only) by the others for up to SHARED_TTL seconds. Nodes that only
+return something already held in that cache (prices, reference series) are
+registered with `shared=False`, so the same frame is not stored twice.
+"""
+import hashlib
+import pickle
+
+from stocksight import instrument
+
+SHARED_TTL = 900
+
+
+def _digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint_value(value):
+    try:
+        return _digest(pickle.dumps(value, protocol=4))
+    except Exception:
+        return _digest(type(value).__qualname__, repr(value))
+
+
+class Graph:
+    def __init__(self, memo=None, shared=None):
+        self.memo = {} if memo is None else memo   # node -> (fingerprint, value)
+        self.shared = shared                        # optional process-wide FrameCache
+        self.recomputed = []                        # nodes evaluated during this run
+        self._nodes = {}
+        self._params = {}
+        self._fps = {}
+
+    def param(self, name, value):
+        """Set a leaf input (widget value, constant)."""
+        self._params[name] = value
+        # downstream fingerprints depend on this one, so drop them all
+        self._fps.clear()
+
+    def node(self, name=None, inputs=(), shared=True):
+        """Decorator registering `fn(*inputs)` as node `name` (defaults to fn.__name__).
+
+        `shared=False` keeps the node out of the shared frame cache (it is
+        still memoized per session).
+        """
+        def register(fn):
+            self._nodes[name or fn.__name__] = (fn, tuple(inputs), shared)
+            return fn
+        return register
+
+    def fingerprint(self, name):
+        if name not in self._fps:
+            if name in self._params:
+                self._fps[name] = fingerprint_value(self._params[name])
+            elif name in self._nodes:
+                fn, inputs, _ = self._nodes[name]
+                self._fps[name] = _digest(name, fn.__code__.co_filename, fn.__qualname__,
+                                          *(self.fingerprint(i) for i in inputs))
+            else:
+                raise KeyError(f"unknown graph input: {name}")
+        return self._fps[name]
+
+    def get(self, name):
+        """Value of a param or node, recomputing only if its fingerprint changed."""
+        if name in self._params:
+            return self._params[name]
+        fp = self.fingerprint(name)
+        cached = self.memo.get(name)
+        if cached is not None and cached[0] == fp:
+            instrument.count("graph", hit=True)
+            return cached[1]
+        instrument.count("graph", hit=False)
+        if self.shared is not None and self._nodes[name][2]:
+            value = self.shared.get_or_compute(("graph", name, fp), self._compute, name, ttl=SHARED_TTL)
+        else:
+            value = self._compute(name)
+        self.memo[name] = (fp, value)
+        return value
+
+    def _compute(self, name):
+        fn, inputs, _ = self._nodes[name]
+        args = [self.get(i) for i in inputs]
+        with instrument.span("compute", name):
+            value = fn(*args)
+        self.recomputed.append(name)
+        return value
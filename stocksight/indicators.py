@@ -0,0 +1,150 @@
+"""Technical indicators for one price frame, computed together.
+
+    params = indicators.Params(sma=(20, 50, 200), ema=(12, 26))
+    table = indicators.compute(frame, params)        # columns SMA20, EMA12, RSI14, MACD, ...
+
+The function makes one pass over the close/high/low arrays:
+- every SMA length and the Bollinger bands are differences of one set of
+  prefix sums;
+- each exponential average (EMA, RSI and ATR smoothing, MACD) is a
+  first-order recursive filter solved in closed form over short blocks.
+Conventions match pandas:
+- EMA is `ewm(span=n, adjust=True)`;
+- RSI and ATR use Wilder smoothing (`ewm(alpha=1/n, adjust=False)`);
+- MACD uses `adjust=False` averages;
+- Bollinger bands use the population standard deviation.
+An indicator is NaN until its look-back is filled. Results are kept in the
+process-wide frame cache keyed by (ticker, range, parameters, data
+version), so sessions viewing the same chart share them.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from stocksight import framecache, instrument
+
+
+class Params(NamedTuple):
+    sma: tuple = (20, 50, 200)
+    ema: tuple = (12, 26)
+    rsi: int = 14
+    macd: tuple = (12, 26, 9)          # fast, slow, signal
+    bollinger: tuple = (20, 2.0)       # length, width in standard deviations
+    atr: int = 14
+
+
+def _window_sum(prefix, n):
+    out = np.full(len(prefix) - 1, np.nan)
+    if 0 < n < len(prefix):
+        out[n - 1:] = prefix[n:] - prefix[:-n]
+    return out
+
+
+def _recursive_filter(u, decay):
+    """y[t] = decay * y[t-1] + u[t] with y[-1] = 0, solved block by block.
+
+    Inside a block the recursion has a closed form (a scaled cumulative sum);
+    blocks are short enough that decay**-len stays below 1e4, which keeps the
+    scaled sums accurate. Only the carry between blocks is a Python loop.
+    """
+    n = len(u)
+    if decay == 0 or n == 0:
+        return u.astype("float64", copy=True)
+    block = int(min(n, max(1, np.log(1e4) // -np.log(decay))))
+    m = -(-n // block)
+    padded = np.zeros(m * block)
+    padded[:n] = u
+    j = np.arange(block)
+    local = np.cumsum(padded.reshape(m, block) * decay ** -j, axis=1) * decay ** j
+    carries = np.empty(m)
+    carry, decay_block = 0.0, decay ** block
+    for k, end in enumerate(local[:, -1].tolist()):
+        carries[k] = carry
+        carry = end + decay_block * carry
+    return (local + carries[:, None] * decay ** (j + 1)).ravel()[:n]
+
+
+def _ewm(x, alpha, adjust, min_periods=1):
+    """Exponentially weighted mean of `x` (leading NaNs skipped)."""
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if not len(valid):
+        return out
+    i0 = valid[0]
+    v = x[i0:]
+    decay = 1 - alpha
+    if adjust:
+        # sum of the weights 1 + decay + ... + decay**t
+        weights = (1 - decay ** np.arange(1, len(v) + 1)) / alpha
+        y = _recursive_filter(v, decay) / weights
+    else:
+        u = alpha * v
+        u[0] = v[0]
+        y = _recursive_filter(u, decay)
+    if min_periods > 1:
+        y[:min_periods - 1] = np.nan
+    out[i0:] = y
+    return out
+
+
+def compute(frame, params=Params()):
+    """DataFrame of all indicators in `params` on `frame`'s index."""
+    close = frame["Close"].ffill().to_numpy(dtype="float64")
+    high = frame["High"].ffill().to_numpy(dtype="float64") if "High" in frame else close
+    low = frame["Low"].ffill().to_numpy(dtype="float64") if "Low" in frame else close
+    n = len(close)
+    out = {}
+
+    # SMAs and Bollinger bands from one set of prefix sums (centred for conditioning)
+    shift = np.nanmean(close) if n else 0.0
+    centred = np.nan_to_num(close - shift)
+    prefix = np.concatenate(([0.0], np.cumsum(centred)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(centred * centred)))
+    for length in params.sma:
+        out[f"SMA{length}"] = _window_sum(prefix, length) / length + shift
+    for length in params.ema:
+        out[f"EMA{length}"] = _ewm(close, 2 / (length + 1), adjust=True, min_periods=length)
+
+    length, width = params.bollinger
+    mean = _window_sum(prefix, length) / length
+    var = np.maximum(_window_sum(prefix_sq, length) / length - mean * mean, 0.0)
+    out["BB_mid"] = mean + shift
+    out["BB_upper"] = out["BB_mid"] + width * np.sqrt(var)
+    out["BB_lower"] = out["BB_mid"] - width * np.sqrt(var)
+
+    change = np.concatenate(([np.nan], np.diff(close)))
+    gain = _ewm(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)),
+                1 / params.rsi, adjust=False, min_periods=params.rsi)
+    loss = _ewm(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)),
+                1 / params.rsi, adjust=False, min_periods=params.rsi)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[f"RSI{params.rsi}"] = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+    out[f"RSI{params.rsi}"][np.isnan(gain)] = np.nan
+
+    fast, slow, signal = params.macd
+    macd = (_ewm(close, 2 / (fast + 1), adjust=False, min_periods=fast)
+            - _ewm(close, 2 / (slow + 1), adjust=False, min_periods=slow))
+    out["MACD"] = macd
+    out["MACD_signal"] = _ewm(macd, 2 / (signal + 1), adjust=False, min_periods=signal)
+    out["MACD_hist"] = macd - out["MACD_signal"]
+
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    out[f"ATR{params.atr}"] = _ewm(true_range, 1 / params.atr, adjust=False, min_periods=params.atr)
+
+    return pd.DataFrame(out, index=frame.index)
+
+
+def _compute(ticker, frame, params):
+    with instrument.span("compute", "indicators", ticker=ticker):
+        return compute(frame, params)
+
+
+def get(ticker, start, end, frame, params=Params()):
+    """`compute(frame, params)` through the shared frame cache."""
+    # the last row and length identify the data version (today's bar can still change)
+    version = (len(frame), frame.index[-1] if len(frame) else None,
+               float(frame["Close"].iloc[-1]) if len(frame) else None)
+    key = ("indicators", ticker.upper(), str(start), str(end), params, version)
+    return framecache.default_cache().get_or_compute(key, _compute, ticker, frame, params)
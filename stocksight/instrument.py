@@ -0,0 +1,265 @@
+"""Per-stage timing spans, cache counters and upstream size counts for both pages.
+
+    with instrument.span("fetch", "yahoo.download", ticker=t):
+        ...
+    instrument.count("price_cache", hit=True)
+
+Spans and counters are process-wide. Each finished span is logged as one
+JSON line on the "stocksight.metrics" logger (written to the file named by
+STOCKSIGHT_METRICS_LOG, or stderr for "-"). `prometheus_text()` renders
+everything in the Prometheus text format and is served at /metrics on
+STOCKSIGHT_METRICS_PORT when that is set. `sidebar_panel()` shows the last
+rerun's spans in the Streamlit sidebar. Pages call `setup()` once per run;
+fragments wrap themselves in `rerun_scope()` so their own reruns are kept.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger("stocksight.metrics")
+
+# seconds; shared by every latency histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_local = threading.local()
+_histograms = defaultdict(lambda: [0] * (len(BUCKETS) + 1))   # (kind, name) -> bucket counts (+Inf last)
+_sums = defaultdict(float)
+_counters = defaultdict(int)                                  # (metric, labels tuple) -> value
+
+
+def _record(kind, name, seconds):
+    key = (kind, name)
+    with _lock:
+        _histograms[key][bisect.bisect_left(BUCKETS, seconds)] += 1
+        _sums[key] += seconds
+
+
+@contextlib.contextmanager
+def span(kind, name, **fields):
+    """Time a block as a `kind` ("fetch", "compute", "render", "rerun") stage called `name`."""
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        _record(kind, name, seconds)
+        entry = {"span": name, "kind": kind, "seconds": round(seconds, 6), **fields}
+        if error:
+            entry["error"] = error
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append(entry)
+        logger.info(json.dumps(entry, default=str))
+
+
+def timed(kind, name=None):
+    """Decorator form of `span`."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def count(cache, hit, n=1):
+    """Cache hit/miss counter for `cache`."""
+    with _lock:
+        _counters[("stocksight_cache_requests_total", (("cache", cache), ("result", "hit" if hit else "miss")))] += n
+
+
+def add_bytes(source, n):
+    """Response payload bytes received over the network from an upstream `source`."""
+    with _lock:
+        _counters[("stocksight_upstream_bytes_total", (("source", source),))] += int(n)
+
+
+def add_response_bytes(source, response):
+    """Sizes of a `requests` response from `source`.
+
+    The wire size comes from Content-Length (compressed when the server
+    gzipped the body) and is skipped for chunked responses that do not send
+    it; the decoded body size is counted separately.
+    """
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit():
+        add_bytes(source, int(length))
+    with _lock:
+        _counters[("stocksight_upstream_decoded_bytes_total", (("source", source),))] += len(response.content)
+
+
+def add_frame_bytes(source, frame):
+    """In-memory size of a frame returned by `source`, for clients that do not expose the payload (yfinance)."""
+    n = int(frame.memory_usage(deep=False, index=True).sum()) if frame is not None else 0
+    with _lock:
+        _counters[("stocksight_upstream_frame_bytes_total", (("source", source),))] += n
+
+
+def begin_rerun(page):
+    """Call at the top of a page script; spans until `end_rerun` belong to this run."""
+    _local.spans = []
+    _local.rerun = (page, time.perf_counter())
+
+
+def end_rerun():
+    """Call at the bottom of a page script to record the whole-run span."""
+    page, t0 = getattr(_local, "rerun", (None, None))
+    if page is None:
+        return
+    seconds = time.perf_counter() - t0
+    _record("rerun", page, seconds)
+    entry = {"span": page, "kind": "rerun", "seconds": round(seconds, 6)}
+    logger.info(json.dumps(entry))
+    _local.last_spans = (_local.spans or []) + [entry]
+    _local.spans = None
+    _local.rerun = (None, None)
+
+
+@contextlib.contextmanager
+def rerun_scope(name):
+    """Collect spans for a `st.fragment` rerun, which runs without the page's begin/end_rerun.
+
+    Usable as a decorator under `@st.fragment`. During a full page run the
+    fragment's spans simply join the page's run.
+    """
+    if getattr(_local, "spans", None) is not None:
+        yield
+        return
+    begin_rerun(name)
+    try:
+        yield
+    finally:
+        end_rerun()
+
+
+def current_spans():
+    spans = getattr(_local, "spans", None)
+    return list(spans if spans is not None else getattr(_local, "last_spans", []))
+
+
+def snapshot():
+    """Plain-dict copy of all histograms and counters (for JSON export)."""
+    with _lock:
+        return {
+            "histograms": {f"{k}:{n}": {"buckets": list(BUCKETS), "counts": list(c), "sum": _sums[(k, n)]}
+                           for (k, n), c in _histograms.items()},
+            "counters": {f"{m}{{{','.join(f'{a}={b}' for a, b in labels)}}}": v
+                         for (m, labels), v in _counters.items()},
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    lines = ["# TYPE stocksight_stage_seconds histogram"]
+    with _lock:
+        for (kind, name), counts in sorted(_histograms.items()):
+            labels = f'kind="{_escape(kind)}",stage="{_escape(name)}"'
+            cumulative = 0
+            for bound, c in zip(BUCKETS, counts):
+                cumulative += c
+                lines.append(f'stocksight_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'stocksight_stage_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"stocksight_stage_seconds_sum{{{labels}}} {_sums[(kind, name)]}")
+            lines.append(f"stocksight_stage_seconds_count{{{labels}}} {cumulative}")
+        for metric in sorted({m for m, _ in _counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (m, labels), value in sorted(_counters.items()):
+                if m == metric:
+                    label_text = ",".join(f'{a}="{_escape(b)}"' for a, b in labels)
+                    lines.append(f"{metric}{{{label_text}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None):
+    """Serve `prometheus_text()` at /metrics on a daemon thread (once per process)."""
+    global _server
+    port = port or os.environ.get("STOCKSIGHT_METRICS_PORT")
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip("/") != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = prometheus_text().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", int(port)), Handler)
+            except OSError as e:
+                logging.error(f"could not start metrics server on port {port}: {str(e)}")
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True, name="metrics-server").start()
+        return _server
+
+
+_log_configured = False
+
+
+def setup():
+    """Attach the JSON log handler and start the metrics endpoint if configured (idempotent)."""
+    global _log_configured
+    with _server_lock:
+        target = os.environ.get("STOCKSIGHT_METRICS_LOG")
+        if target and not _log_configured:
+            handler = logging.StreamHandler() if target == "-" else logging.FileHandler(target)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            _log_configured = True
+    start_metrics_server()
+
+
+def sidebar_panel():
+    """Optional sidebar panel listing the last run's spans and the cache counters."""
+    import pandas as pd
+    import streamlit as st
+
+    if not st.sidebar.toggle("Diagnostics", False, key="diagnostics_panel"):
+        return
+    spans = current_spans()
+    if spans:
+        table = pd.DataFrame(spans)[["kind", "span", "seconds"]].sort_values("seconds", ascending=False)
+        st.sidebar.dataframe(table, hide_index=True)
+    counters = snapshot()["counters"]
+    if counters:
+        st.sidebar.json(counters, expanded=False)
+    from stocksight import framecache
+
+    framecache.memory_panel()
+    st.sidebar.download_button("Export metrics (JSON)", json.dumps(snapshot(), indent=2),
+                               file_name="stocksight_metrics.json", mime="application/json")
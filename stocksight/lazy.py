@@ -0,0 +1,81 @@
+"""Deferred imports for heavy, rarely used modules.
+
+`lazy_import("matplotlib.pyplot")` returns a stand-in that performs the real
+import the first time one of its attributes is used, so a page only pays for
+matplotlib when the section that needs it actually runs (nltk is imported
+inside the sentiment scorer for the same reason).
+
+Run `python -m stocksight.lazy` to print the cumulative import cost of the
+modules the pages depend on (from `python -X importtime`), slowest first;
+`--json PATH` also writes the numbers for tracking cold-start time.
+"""
+import importlib
+import json
+import subprocess
+import sys
+import threading
+
+# what the two pages pull in at startup, plus the heavy modules they defer
+STARTUP_MODULES = [
+    "streamlit", "pandas", "numpy", "plotly.express", "plotly.graph_objects", "pyarrow",
+    "yfinance", "lxml.html", "requests", "matplotlib.pyplot", "nltk", "alpha_vantage.fundamentaldata",
+    "stocksight.prices", "stocksight.analytics",
+]
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self.__dict__["_module"] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module stand-in that imports `name` on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def import_cost(module):
+    """Cumulative import time of `module` in microseconds, measured in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1].strip())
+    return None
+
+
+def import_report(modules=STARTUP_MODULES):
+    """{module: cumulative microseconds or None if it failed to import}."""
+    return {m: import_cost(m) for m in modules}
+
+
+if __name__ == "__main__":
+    report = import_report()
+    for module, cost in sorted(report.items(), key=lambda kv: -(kv[1] or 0)):
+        print(f"{module:36} {'not installed' if cost is None else f'{cost / 1000:9.1f} ms'}")
+    if "--json" in sys.argv:
+        with open(sys.argv[sys.argv.index("--json") + 1], "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,307 @@
+"""Live intraday mode: per-bar streaming updates instead of full recomputation.
+
+A `LiveSession` polls a bar feed for the ticker and one for the benchmark.
+It pushes each new bar through constant-time accumulators:
+- log return;
+- EMA;
+- rolling beta against the benchmark;
+- growth, running peak and drawdown;
+- "Daily % Change" against the previous session's close.
+Finished rows are appended to a growable columnar buffer. A refresh costs
+O(new bars) whatever the length of the day.
+
+Feeds:
+- `YahooIntradayFeed` polls yfinance 1-minute bars. Concurrent sessions
+  are single-flighted per ticker.
+- `ReplayFeed` replays a saved bar file, or a deterministic synthetic
+  session, a few bars per poll.
+Polled bars can also be appended to a `bars.BarStore` opened for the
+feed's `name`, which keeps the minute history for longer ranges. Set
+STOCKSIGHT_LIVE_REPLAY=fake (or to a .parquet/.csv path) to use the replay
+feed without network access.
+"""
+import math
+import os
+import zlib
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from stocksight import instrument, singleflight
+from stocksight.prices import _hash_normal
+from stocksight.reference import BENCHMARK, MARKET_TZ
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+LIVE_COLUMNS = ["Close", "log_return", "EMA", "beta", "growth", "peak", "drawdown", "Daily % Change"]
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_BARS = 390
+
+
+class EMA:
+    """Exponential moving average, `ewm(span=span, adjust=False)` one value at a time."""
+
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = math.nan
+
+    def update(self, x):
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingBeta:
+    """cov(x, y) / var(y) over the last `window` pairs, from running sums.
+
+    The sums are rebuilt from the window every `resync` updates so rounding
+    from adding and removing values cannot build up over a long session.
+    """
+
+    def __init__(self, window, resync=4096):
+        self.window = window
+        self.resync = resync
+        self._pairs = deque()
+        self._sums = [0.0] * 5          # x, y, xx, yy, xy
+        self._updates = 0
+
+    def _add(self, x, y, sign):
+        s = self._sums
+        s[0] += sign * x
+        s[1] += sign * y
+        s[2] += sign * x * x
+        s[3] += sign * y * y
+        s[4] += sign * x * y
+
+    def update(self, x, y):
+        self._pairs.append((x, y))
+        self._add(x, y, 1)
+        if len(self._pairs) > self.window:
+            self._add(*self._pairs.popleft(), -1)
+        self._updates += 1
+        if self._updates % self.resync == 0:
+            self._sums = [0.0] * 5
+            for px, py in self._pairs:
+                self._add(px, py, 1)
+        return self.value
+
+    @property
+    def value(self):
+        n = len(self._pairs)
+        if n < self.window:
+            return math.nan
+        sx, sy, _, syy, sxy = self._sums
+        var_y = syy - sy * sy / n
+        return (sxy - sx * sy / n) / var_y if var_y > 0 else math.nan
+
+
+class Drawdown:
+    """Growth of 1, its running peak and the drawdown fraction, from log returns."""
+
+    def __init__(self):
+        self.log_growth = 0.0
+        self.peak = 1.0
+
+    def update(self, log_return):
+        if not math.isnan(log_return):
+            self.log_growth += log_return
+        growth = math.exp(self.log_growth)
+        self.peak = max(self.peak, growth)
+        return growth, self.peak, (self.peak - growth) / self.peak
+
+
+class DailyChange:
+    """Percent change of the latest close against the previous session's last close."""
+
+    def __init__(self, previous_close=math.nan):
+        self.reference = previous_close
+        self._day = None
+        self._last = math.nan
+
+    def update(self, timestamp, close):
+        day = timestamp.date()
+        if self._day is not None and day != self._day:
+            self.reference = self._last
+        self._day, self._last = day, close
+        return (close / self.reference - 1) * 100 if self.reference == self.reference else math.nan
+
+
+class _Columns:
+    """Append-only float columns with amortized O(1) appends (capacity doubles)."""
+
+    def __init__(self, names, capacity=512):
+        self.names = list(names)
+        self._data = np.full((capacity, len(self.names)), np.nan)
+        self._index = np.empty(capacity, dtype="datetime64[ns]")
+        self.size = 0
+
+    def append(self, timestamp, row):
+        if self.size == len(self._data):
+            self._data = np.concatenate([self._data, np.full_like(self._data, np.nan)])
+            self._index = np.concatenate([self._index, np.empty_like(self._index)])
+        self._data[self.size] = row
+        self._index[self.size] = np.datetime64(timestamp.tz_convert("UTC").tz_localize(None)
+                                               if timestamp.tzinfo else timestamp, "ns")
+        self.size += 1
+
+    def frame(self, tz=None):
+        index = pd.DatetimeIndex(self._index[:self.size], name="Datetime")
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(self._data[:self.size].copy(), index=index, columns=self.names)
+
+
+class Feed:
+    """Source of intraday bars; `poll()` returns only bars not returned before."""
+
+    name = "base"
+
+    def poll(self):
+        raise NotImplementedError
+
+
+class YahooIntradayFeed(Feed):
+    name = "yahoo"
+
+    def __init__(self, ticker, interval="1m"):
+        self.ticker = ticker
+        self.interval = interval
+        self.last = None
+
+    def _download(self):
+        import yfinance as yf
+
+        data = yf.download(self.ticker, period="1d", interval=self.interval, progress=False, auto_adjust=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        return data
+
+    def poll(self):
+        with instrument.span("fetch", "yahoo.intraday", ticker=self.ticker):
+            data = singleflight.group().do(("yahoo.intraday", self.ticker, self.interval), self._download)
+        if data is None or not len(data):
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        # the bar in progress is still changing; only hand out completed bars
+        data = data.iloc[:-1]
+        if self.last is not None:
+            data = data[data.index > self.last]
+        if len(data):
+            self.last = data.index[-1]
+        return data[BAR_COLUMNS]
+
+
+def synthetic_session(ticker, day, base_price=100.0, volatility=0.001):
+    """Deterministic 1-minute bars for one regular session of `day` (New York time)."""
+    day = pd.Timestamp(day).normalize()
+    index = pd.date_range(day + SESSION_OPEN, periods=SESSION_BARS, freq="min", tz=MARKET_TZ)
+    seed = zlib.crc32(ticker.encode())
+    minute = (day - pd.Timestamp("1970-01-01")).days * 1440.0 + np.arange(SESSION_BARS)
+    ret = volatility * _hash_normal(minute, seed)
+    spread = np.abs(_hash_normal(minute, seed + 1)) * volatility
+    close = base_price * np.exp(np.cumsum(ret))
+    return pd.DataFrame({
+        "Open": close * np.exp(-ret),
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Close": close,
+        "Volume": (1e4 * (1 + spread * 100)).astype("int64"),
+    }, index=pd.DatetimeIndex(index, name="Datetime"))
+
+
+class ReplayFeed(Feed):
+    """Replays a bar frame `bars_per_poll` bars at a time (local testing and demos)."""
+
+    name = "replay"
+
+    def __init__(self, bars, bars_per_poll=5):
+        self.bars = bars[BAR_COLUMNS]
+        self.bars_per_poll = bars_per_poll
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path, bars_per_poll=5):
+        bars = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, index_col=0, parse_dates=True)
+        return cls(bars, bars_per_poll)
+
+    @classmethod
+    def synthetic(cls, ticker, day=None, bars_per_poll=5):
+        day = day or pd.Timestamp.now(MARKET_TZ).tz_localize(None)
+        return cls(synthetic_session(ticker, day), bars_per_poll)
+
+    def poll(self):
+        chunk = self.bars.iloc[self.position:self.position + self.bars_per_poll]
+        self.position += len(chunk)
+        return chunk
+
+    @property
+    def finished(self):
+        return self.position >= len(self.bars)
+
+
+def default_feed(ticker, bars_per_poll=5):
+    """Yahoo 1-minute bars, or a replay feed when STOCKSIGHT_LIVE_REPLAY is set."""
+    replay = os.environ.get("STOCKSIGHT_LIVE_REPLAY")
+    if not replay:
+        return YahooIntradayFeed(ticker)
+    if replay == "fake":
+        return ReplayFeed.synthetic(ticker, bars_per_poll=bars_per_poll)
+    path = os.path.join(replay, f"{ticker}.parquet") if os.path.isdir(replay) else replay
+    return ReplayFeed.from_file(path, bars_per_poll)
+
+
+class LiveSession:
+    """Streaming LIVE_COLUMNS for one ticker against a benchmark feed."""
+
+    def __init__(self, ticker, feed=None, benchmark_feed=None, ema_span=20, beta_window=60,
+                 previous_close=math.nan, bar_store=None):
+        self.ticker = ticker
+        self.bar_store = bar_store
+        self.feed = feed or default_feed(ticker)
+        self.benchmark_feed = benchmark_feed or default_feed(BENCHMARK)
+        self.ema = EMA(ema_span)
+        self.beta = RollingBeta(beta_window)
+        self.drawdown = Drawdown()
+        self.daily_change = DailyChange(previous_close)
+        self.rows = _Columns(LIVE_COLUMNS)
+        self.tz = None
+        self._last_close = math.nan
+        self._bench_closes = {}
+        self._last_bench = math.nan
+
+    def update(self):
+        """Poll both feeds and push every new bar; returns the number of bars added."""
+        bench = self.benchmark_feed.poll()
+        self._bench_closes.update(zip(bench.index, bench["Close"].to_numpy(dtype="float64")))
+        bars = self.feed.poll()
+        if self.bar_store is not None:
+            # keep the minute history so longer ranges can be charted from the bar store
+            self.bar_store.append(self.ticker, bars)
+        if len(bars) and self.tz is None:
+            self.tz = bars.index.tz
+        with instrument.span("compute", "live.update", ticker=self.ticker, bars=len(bars)):
+            for timestamp, close in zip(bars.index, bars["Close"].to_numpy(dtype="float64")):
+                self.push(timestamp, close, self._bench_closes.pop(timestamp, math.nan))
+        if len(bars):
+            # benchmark bars the ticker never traded on would otherwise pile up
+            last = bars.index[-1]
+            self._bench_closes = {t: c for t, c in self._bench_closes.items() if t > last}
+        return len(bars)
+
+    def push(self, timestamp, close, bench_close=math.nan):
+        """Constant-time update for one bar."""
+        log_return = math.log(close / self._last_close) if self._last_close == self._last_close else math.nan
+        self._last_close = close
+        bench_return = math.nan
+        if bench_close == bench_close:
+            if self._last_bench == self._last_bench:
+                bench_return = math.log(bench_close / self._last_bench)
+            self._last_bench = bench_close
+        beta = self.beta.value
+        if log_return == log_return and bench_return == bench_return:
+            beta = self.beta.update(log_return, bench_return)
+        growth, peak, drawdown = self.drawdown.update(log_return)
+        self.rows.append(timestamp, (close, log_return, self.ema.update(close), beta, growth, peak,
+                                     drawdown, self.daily_change.update(timestamp, close)))
+
+    def frame(self):
+        return self.rows.frame(self.tz)
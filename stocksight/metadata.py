@@ -0,0 +1,108 @@
+"""Ticker metadata (`yf.Ticker(...).info`) fetched once per ticker and cached per field.
+
+A single `info` fetch returns every field, so the cache stores the whole dict
+and decides freshness per field: quotes go stale in minutes, ratios in hours,
+and descriptive fields like sector only after a day.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stocksight import instrument
+from stocksight.singleflight import coalesce
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+FIELD_TTLS = {
+    "regularMarketOpen": 5 * MINUTE,
+    "regularMarketPreviousClose": 5 * MINUTE,
+    "fiftyTwoWeekHigh": 5 * MINUTE,
+    "fiftyTwoWeekLow": 5 * MINUTE,
+    "marketCap": 15 * MINUTE,
+    "beta": HOUR,
+    "debtToEquity": 6 * HOUR,
+    "quickRatio": 6 * HOUR,
+    "currentRatio": 6 * HOUR,
+    "sector": DAY,
+    "industry": DAY,
+    "longBusinessSummary": DAY,
+}
+DEFAULT_TTL = 15 * MINUTE
+
+
+@coalesce("yahoo.info")
+def yahoo_info(ticker):
+    import yfinance as yf
+
+    return yf.Ticker(ticker).info
+
+
+class MetadataService:
+    """Batched, TTL-cached access to ticker info dicts."""
+
+    def __init__(self, fetch_info=yahoo_info, max_workers=8, ttls=None, clock=time.monotonic):
+        self.fetch_info = fetch_info
+        self.max_workers = max_workers
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self.clock = clock
+        self._cache = {}   # ticker -> (info, fetched_at)
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, ticker, fields, now):
+        entry = self._cache.get(ticker)
+        if entry is None:
+            return False
+        age = now - entry[1]
+        return all(age < self.ttls.get(f, DEFAULT_TTL) for f in fields)
+
+    def _fetch(self, ticker):
+        try:
+            with instrument.span("fetch", "yahoo.info", ticker=ticker):
+                return self.fetch_info(ticker) or {}
+        except Exception as e:
+            logging.error(f"error fetching info for {ticker}: {str(e)}")
+            return None
+
+    def get_many(self, tickers, fields):
+        """Return {ticker: {field: value}}, refreshing stale tickers in one parallel batch."""
+        tickers = list(dict.fromkeys(tickers))
+        now = self.clock()
+        with self._lock:
+            stale = [t for t in tickers if not self._is_fresh(t, fields, now)]
+        instrument.count("metadata", hit=True, n=len(tickers) - len(stale))
+        instrument.count("metadata", hit=False, n=len(stale))
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale))) as pool:
+                fetched = dict(zip(stale, pool.map(self._fetch, stale)))
+            with self._lock:
+                for t, info in fetched.items():
+                    # on failure keep serving whatever we had before
+                    if info is not None:
+                        self._cache[t] = (info, now)
+        with self._lock:
+            return {t: {f: self._cache.get(t, ({}, 0))[0].get(f) for f in fields} for t in tickers}
+
+    def get(self, ticker, field):
+        return self.get_many([ticker], [field])[ticker][field]
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(ticker, None)
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def default_service():
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = MetadataService()
+        return _default_service
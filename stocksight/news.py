@@ -0,0 +1,155 @@
+"""Finviz headline fetching over pooled keep-alive connections.
+
+Responses are revalidated with ETag/Last-Modified, so an unchanged page costs
+a 304 and no parsing. Only the `news-table` element is cut out of the page
+and handed to lxml, and rows are read with precompiled XPath expressions.
+
+Set STOCKSIGHT_NEWS_FIXTURES to a directory of saved `<TICKER>.html` pages to
+run without network access (tests, benchmarks). `python -m stocksight.news
+DIR TICKER` times the parser on such a fixture.
+"""
+import datetime
+import os
+import re
+import threading
+
+from lxml import etree, html
+
+from stocksight import instrument, singleflight
+
+FINVIZ_URL = "https://finviz.com/quote.ashx?t={ticker}"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.8",
+    "Connection": "keep-alive",
+}
+
+NEWS_COLUMNS = ["Date", "Time", "Title", "Source", "Source Link"]
+
+_TABLE_START = re.compile(rb"<table[^>]*\bid=[\"']news-table[\"']", re.I)
+_TABLE_END = re.compile(rb"</table\s*>", re.I)
+
+_ROWS = etree.XPath("//tr[.//a]")
+_TITLE = etree.XPath("string((.//a)[1])")
+_SOURCE = etree.XPath("string(.//div[contains(concat(' ', normalize-space(@class), ' '), ' news-link-right ')])")
+_LINK = etree.XPath("string((.//a[contains(concat(' ', normalize-space(@class), ' '), ' tab-link-news ')]/@href)[1])")
+_TIME = etree.XPath("string(.//td[@align='right'])")
+
+
+def extract_news_table(page):
+    """Slice of the page holding just the news table, or None if it is missing."""
+    start = _TABLE_START.search(page)
+    if start is None:
+        return None
+    end = _TABLE_END.search(page, start.end())
+    return page[start.start():end.end() if end else len(page)]
+
+
+def parse_news(page, today=None):
+    """Rows of [date, time, title, source, link] from a finviz quote page (bytes).
+
+    Finviz only prints the date on the first headline of each day, so later
+    rows inherit it; "Today" becomes `today`.
+    """
+    today = today or datetime.date.today()
+    table = extract_news_table(page)
+    if table is None:
+        return []
+    root = html.fromstring(table)
+    parsed_data = []
+    date = None
+    for row in _ROWS(root):
+        time_data = _TIME(row).strip().split()
+        if not time_data:
+            continue
+        if len(time_data) == 1:
+            time = time_data[0]
+        else:
+            date = today if time_data[0] == "Today" else time_data[0]
+            time = time_data[1]
+        parsed_data.append([date, time, _TITLE(row).strip(), _SOURCE(row).strip(), _LINK(row) or None])
+    return parsed_data
+
+
+class NewsFetcher:
+    def __init__(self, session=None, fixture_dir=None, pool_size=10, timeout=10):
+        self.fixture_dir = fixture_dir
+        self.timeout = timeout
+        self._session = session
+        self._pool_size = pool_size
+        self._validators = {}   # url -> (etag, last_modified, rows)
+        self._lock = threading.Lock()
+        self.not_modified = 0
+
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def headlines(self, ticker):
+        """Parsed headline rows for a ticker (see `parse_news`)."""
+        ticker = ticker.upper()
+        if self.fixture_dir:
+            with open(os.path.join(self.fixture_dir, f"{ticker}.html"), "rb") as f:
+                return parse_news(f.read())
+        return singleflight.group().do(("finviz", ticker), self._fetch, ticker)
+
+    def _fetch(self, ticker):
+        url = FINVIZ_URL.format(ticker=ticker)
+        with self._lock:
+            cached = self._validators.get(url)
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+        with instrument.span("fetch", "finviz.quote", ticker=ticker):
+            response = self.session().get(url, headers=headers, timeout=self.timeout)
+        instrument.add_response_bytes("finviz", response)
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            instrument.count("finviz", hit=True)
+            return cached[2]
+        instrument.count("finviz", hit=False)
+        response.raise_for_status()
+        with instrument.span("compute", "finviz.parse"):
+            rows = parse_news(response.content)
+        etag, modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if etag or modified:
+            with self._lock:
+                self._validators[url] = (etag, modified, rows)
+        return rows
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher():
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = NewsFetcher(fixture_dir=os.environ.get("STOCKSIGHT_NEWS_FIXTURES"))
+        return _default_fetcher
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    fixture_dir, ticker = sys.argv[1], sys.argv[2]
+    with open(os.path.join(fixture_dir, f"{ticker.upper()}.html"), "rb") as f:
+        page = f.read()
+    runs = 50
+    seconds = timeit.timeit(lambda: parse_news(page), number=runs) / runs
+    print(f"{len(parse_news(page))} headlines, {seconds * 1000:.2f} ms per parse ({len(page)} bytes)")
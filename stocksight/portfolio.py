@@ -0,0 +1,170 @@
+"""Weighted portfolios: covariance-matrix analytics and a batched efficient frontier.
+
+The aligned (days x tickers) log-return matrix is built once. Everything
+else comes from its mean vector and covariance matrix:
+- portfolio variance is w' S w;
+- beta is w' cov(r, benchmark) / var(benchmark);
+- risk contributions are w * (S w) / sigma.
+Portfolio log returns are approximated by R w, as for a portfolio
+rebalanced daily. Frontier weights are solved for every target at once:
+in closed form when shorting is allowed, or by batched projected gradient
+on the simplex when it is not. Daily units are used throughout (ddof=1).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stocksight import analytics, drawdowns, prices
+
+SUMMARY_COLUMNS = ["expected_return", "volatility", "beta", "alpha", "sharpe", "max_drawdown"]
+
+
+def parse_holdings(text):
+    """{TICKER: weight} from lines like 'AAPL 0.3' or 'MSFT, 20' (weight defaults to 1)."""
+    holdings = {}
+    for line in text.splitlines():
+        parts = line.replace(",", " ").split("#")[0].split()
+        if not parts:
+            continue
+        weight = float(parts[1]) if len(parts) > 1 else 1.0
+        ticker = parts[0].upper()
+        holdings[ticker] = holdings.get(ticker, 0.0) + weight
+    return holdings
+
+
+def normalize_weights(holdings):
+    """Weights as a Series summing to 1 (gross exposure is kept for long/short books)."""
+    weights = pd.Series(holdings, dtype="float64")
+    total = weights.sum()
+    if not total:
+        raise ValueError("portfolio weights sum to zero")
+    return weights / total
+
+
+def return_matrix(tickers, start, end, store=None, max_workers=8):
+    """Log returns of 'Adj Close' for `tickers`, on the dates where all of them traded."""
+    store = store or prices.default_store()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(lambda t: store.get(t, start, end)["Adj Close"], tickers))
+    closes = pd.concat(dict(zip(tickers, frames)), axis=1)
+    return analytics.log_returns(closes).dropna(how="any")
+
+
+def moments(returns):
+    """(mean vector, covariance matrix) of a return matrix."""
+    r = np.asarray(returns, dtype="float64")
+    return r.mean(axis=0), np.cov(r, rowvar=False, ddof=1).reshape(r.shape[1], r.shape[1])
+
+
+def analyze(returns, weights, benchmark, rfr):
+    """Portfolio summary, per-holding risk breakdown and daily portfolio returns.
+
+    returns: (days x tickers) log returns; weights: Series indexed by ticker;
+    benchmark, rfr: daily Series. Returns (summary Series with
+    SUMMARY_COLUMNS, holdings DataFrame, portfolio return Series).
+    """
+    frame, bench, rf = analytics.align(returns, benchmark, rfr)
+    keep = ~(np.isnan(bench) | np.isnan(rf))
+    frame, bench, rf = frame[keep], bench[keep], rf[keep]
+    w = weights.reindex(frame.columns).fillna(0.0).to_numpy()
+    r = frame.to_numpy(dtype="float64")
+
+    mu, cov = moments(r)
+    db = bench - bench.mean()
+    var_b = db @ db / (len(db) - 1)
+    cov_b = (r - mu).T @ db / (len(db) - 1)
+    betas = cov_b / var_b
+
+    sigma_w = cov @ w
+    variance = w @ sigma_w
+    vol = np.sqrt(variance)
+    # excess returns differ from r by the shared rf, so only rf's own (co)variance adds to S
+    df = rf - rf.mean()
+    cov_f = (r - mu).T @ df / (len(df) - 1)
+    excess_var = variance - 2 * w @ cov_f + df @ df / (len(df) - 1)
+    expected = w @ mu
+    beta = w @ betas
+    alpha = expected - (rf.mean() + beta * (bench.mean() - rf.mean()))
+
+    port = pd.Series(r @ w, index=frame.index, name="portfolio")
+    episodes = drawdowns.episodes(port)
+    summary = pd.Series({
+        "expected_return": expected,
+        "volatility": vol,
+        "beta": beta,
+        "alpha": alpha,
+        "sharpe": (expected - rf.mean()) / np.sqrt(excess_var),
+        "max_drawdown": episodes["depth"].max() if len(episodes) else 0.0,
+    })[SUMMARY_COLUMNS]
+    holdings = pd.DataFrame({
+        "weight": w,
+        "expected_return": mu,
+        "volatility": np.sqrt(np.diag(cov)),
+        "beta": betas,
+        "risk_contribution": w * sigma_w / vol if vol else np.nan,
+    }, index=frame.columns)
+    return summary, holdings, port
+
+
+def _solve(cov, rhs, ridge):
+    n = cov.shape[0]
+    jitter = ridge * np.trace(cov) / n if n else 0.0
+    return np.linalg.solve(cov + jitter * np.eye(n), rhs)
+
+
+def min_variance(cov, ridge=1e-8):
+    """Fully invested minimum-variance weights (shorting allowed)."""
+    inv_one = _solve(cov, np.ones(cov.shape[0]), ridge)
+    return inv_one / inv_one.sum()
+
+
+def _project_simplex(W):
+    """Euclidean projection of each row of W onto {w >= 0, sum w = 1}."""
+    n = W.shape[1]
+    u = -np.sort(-W, axis=1)
+    css = np.cumsum(u, axis=1) - 1
+    k = np.arange(1, n + 1)
+    rho = (u - css / k > 0).sum(axis=1)
+    theta = css[np.arange(len(W)), rho - 1] / rho
+    return np.maximum(W - theta[:, None], 0.0)
+
+
+def frontier(mu, cov, n_points=50, long_only=False, ridge=1e-8, iterations=500, tol=1e-10):
+    """Efficient-frontier weights for `n_points` targets, solved as one batch.
+
+    Returns (weights (n_points x N), expected returns, volatilities). With
+    shorting allowed the targets are expected returns between the
+    min-variance return and the best single asset, each solved in closed form
+    from S^-1 [1, mu]. Long-only portfolios trade return against variance
+    over a log-spaced range of risk aversions, all iterated together until
+    no row's weights move by more than `tol` (or `iterations` is reached).
+    """
+    mu = np.asarray(mu, dtype="float64")
+    cov = np.asarray(cov, dtype="float64")
+    n = len(mu)
+    if long_only:
+        lipschitz = max(np.linalg.eigvalsh(cov)[-1], 1e-300)
+        # from nearly return-maximizing to nearly minimum-variance; floored so all-zero mu still has a scale
+        scale = max(np.abs(mu).max(), 1e-12)
+        aversion = np.logspace(-1, 4, n_points)[:, None] * scale / lipschitz
+        step = 1 / (aversion * lipschitz)
+        W = np.full((n_points, n), 1.0 / n)
+        for _ in range(iterations):
+            grad = aversion * (W @ cov) - mu
+            W_next = _project_simplex(W - step * grad)
+            moved = np.sqrt(((W_next - W) ** 2).sum(axis=1)).max()
+            W = W_next
+            if moved < tol:
+                break
+    else:
+        inv = _solve(cov, np.column_stack([np.ones(n), mu]), ridge)
+        a, b, c = inv[:, 0].sum(), inv[:, 1].sum(), mu @ inv[:, 1]
+        det = a * c - b * b
+        targets = np.linspace(b / a, mu.max(), n_points)
+        # Lagrange multipliers of min w'Sw s.t. 1'w = 1, mu'w = target, for every target at once
+        lam = np.vstack([(c - b * targets) / det, (a * targets - b) / det])
+        W = (inv @ lam).T
+    returns = W @ mu
+    vols = np.sqrt(np.einsum("ij,jk,ik->i", W, cov, W))
+    return W, returns, vols
@@ -0,0 +1,265 @@
+"""Daily OHLCV prices behind a pluggable provider with an on-disk Parquet cache.
+
+The store keeps one Parquet file per ticker plus a small JSON sidecar listing
+the date ranges that have already been fetched, so a request only goes
+upstream for the dates it does not have yet. Gaps without business days
+(weekends) count as fetched. Other empty answers are recorded with a
+retry time instead, since yfinance also returns nothing on errors.
+"""
+import json
+import os
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from stocksight import framecache, instrument, singleflight
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+CACHE_DIR = os.environ.get("STOCKSIGHT_CACHE_DIR", ".stocksight_cache")
+
+# ranges reaching past today can still gain bars, so shared copies of them expire
+OPEN_RANGE_TTL = 300
+# an empty answer for dates that include business days may be an error or a rate limit:
+# it is remembered (not covered) and asked for again only after this long
+EMPTY_RETRY_AFTER = pd.Timedelta(hours=6)
+
+
+def _day(value):
+    return pd.Timestamp(value).normalize().tz_localize(None)
+
+
+class PriceProvider:
+    """Source of daily bars. `fetch` returns bars for dates in [start, end)."""
+
+    name = "base"
+
+    def fetch(self, ticker, start, end):
+        raise NotImplementedError
+
+
+class YahooPriceProvider(PriceProvider):
+    name = "yahoo"
+
+    def fetch(self, ticker, start, end):
+        # concurrent sessions asking for the same bars share one download
+        key = ("yahoo.download", ticker.upper(), _day(start), _day(end))
+        return singleflight.group().do(key, self._download, ticker, start, end)
+
+    def _download(self, ticker, start, end):
+        import yfinance as yf
+
+        data = yf.download(ticker, start=start, end=end, progress=False, auto_adjust=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        return data
+
+
+class FakePriceProvider(PriceProvider):
+    """Deterministic random-walk bars for offline runs and tests.
+
+    The path for a ticker depends only on the ticker and the calendar, so
+    overlapping requests always agree with each other.
+    """
+
+    name = "fake"
+    EPOCH = pd.Timestamp("1970-01-01")
+
+    def __init__(self, base_price=100.0, volatility=0.02):
+        self.base_price = base_price
+        self.volatility = volatility
+        self.calls = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, _day(start), _day(end)))
+        start, end = _day(start), _day(end)
+        # the walk always starts at EPOCH so a date gets the same bar whatever range is asked for
+        dates = pd.date_range(self.EPOCH, max(end, self.EPOCH) - pd.Timedelta(days=1), freq="D")
+        dates = dates[dates.dayofweek < 5]
+        seed = zlib.crc32(ticker.encode())
+        day_num = (dates - self.EPOCH).days.to_numpy().astype("float64")
+        ret = self.volatility * _hash_normal(day_num, seed)
+        spread = np.abs(_hash_normal(day_num, seed + 1)) * self.volatility
+        close = self.base_price * np.exp(np.cumsum(ret))
+        data = pd.DataFrame({
+            "Open": close * np.exp(-ret / 2),
+            "High": close * (1 + spread),
+            "Low": close * (1 - spread),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": (1e6 * (1 + spread * 10)).astype("int64"),
+        }, index=pd.DatetimeIndex(dates, name="Date"))
+        return data.loc[(data.index >= start) & (data.index < end)]
+
+
+def _hash_normal(x, seed):
+    # cheap counter-based normals: two hashed uniforms through Box-Muller
+    u1 = np.modf(np.abs(np.sin(x * 12.9898 + seed * 78.233)) * 43758.5453)[0]
+    u2 = np.modf(np.abs(np.sin(x * 39.3467 + seed * 11.135)) * 24634.6345)[0]
+    u1 = np.clip(u1, 1e-12, 1.0)
+    return np.sqrt(-2 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+def _missing_ranges(covered, start, end):
+    missing = []
+    cursor = start
+    for s, e in covered:
+        if e <= cursor:
+            continue
+        if s >= end:
+            break
+        if s > cursor:
+            missing.append((cursor, min(s, end)))
+        cursor = max(cursor, e)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _replace(path, write):
+    """Atomically replace `path` with what `write(tmp_path)` writes.
+
+    The temporary name is unique, so processes saving the same ticker never
+    write into each other's file; the last `os.replace` wins.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_json(path, value):
+    with open(path, "w") as f:
+        json.dump(value, f)
+
+
+def _empty():
+    return pd.DataFrame({c: np.empty(0, dtype="int64" if c == "Volume" else "float64") for c in OHLCV_COLUMNS},
+                        index=pd.DatetimeIndex([], dtype="datetime64[ns]", name="Date"))
+
+
+class PriceStore:
+    """Per-ticker Parquet cache in front of a `PriceProvider`."""
+
+    def __init__(self, provider=None, root=CACHE_DIR):
+        self.provider = provider or YahooPriceProvider()
+        self.root = os.path.join(root, "prices", self.provider.name)
+        os.makedirs(self.root, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _paths(self, ticker):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker.upper())
+        base = os.path.join(self.root, safe)
+        return base + ".parquet", base + ".json"
+
+    def _load(self, ticker):
+        """(bars, covered ranges, empty attempts as [start, end, retry_at])."""
+        data_path, meta_path = self._paths(ticker)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return _empty(), [], []
+        with open(meta_path) as f:
+            meta = json.load(f)
+        covered = [[pd.Timestamp(s), pd.Timestamp(e)] for s, e in meta["covered"]]
+        empty = [[pd.Timestamp(s), pd.Timestamp(e), pd.Timestamp(r)] for s, e, r in meta.get("empty", [])]
+        return pd.read_parquet(data_path), covered, empty
+
+    def _save(self, ticker, data, covered, empty):
+        data_path, meta_path = self._paths(ticker)
+        meta = {"covered": [[s.isoformat(), e.isoformat()] for s, e in covered],
+                "empty": [[s.isoformat(), e.isoformat(), r.isoformat()] for s, e, r in empty]}
+        _replace(data_path, data.to_parquet)
+        _replace(meta_path, lambda tmp: _write_json(tmp, meta))
+
+    def get(self, ticker, start, end):
+        """Bars for [start, end), fetching only the dates not already on disk."""
+        start, end = _day(start), _day(end)
+        if end <= start:
+            return _empty()
+        # today's bar is still forming, so it is never recorded as covered
+        settled = _day(pd.Timestamp.today())
+        now = pd.Timestamp.now()
+        with self._lock(ticker):
+            data, covered, empty = self._load(ticker)
+            empty = [attempt for attempt in empty if attempt[2] > now]
+            missing = _missing_ranges(_merge_ranges(covered + [[s, e] for s, e, _ in empty]), start, end)
+            instrument.count("prices", hit=not missing)
+            if missing:
+                frames = [data] if len(data) else []
+                for s, e in missing:
+                    with instrument.span("fetch", f"{self.provider.name}.download", ticker=ticker):
+                        fetched = self.provider.fetch(ticker, s, e)
+                    instrument.add_frame_bytes(self.provider.name, fetched)
+                    if len(fetched):
+                        fetched = fetched[[c for c in OHLCV_COLUMNS if c in fetched.columns]]
+                        fetched.index = pd.DatetimeIndex(fetched.index).tz_localize(None)
+                        fetched.index.name = "Date"
+                        frames.append(fetched)
+                    if s >= settled:
+                        continue
+                    upto = min(e, settled)
+                    if len(fetched) or not np.busday_count(s.date(), upto.date()):
+                        # bars arrived, or the gap is only a weekend: nothing more will ever come for it
+                        covered.append([s, upto])
+                    else:
+                        empty.append([s, upto, now + EMPTY_RETRY_AFTER])
+                if frames:
+                    data = pd.concat(frames)
+                    data = data[~data.index.duplicated(keep="last")].sort_index()
+                covered = _merge_ranges(covered)
+                self._save(ticker, data, covered, empty)
+        if not len(data):
+            return data
+        return data.loc[(data.index >= start) & (data.index < end)].copy()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """Process-wide store; set STOCKSIGHT_PRICE_PROVIDER=fake to run offline."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            if os.environ.get("STOCKSIGHT_PRICE_PROVIDER") == "fake":
+                provider = FakePriceProvider()
+            else:
+                provider = YahooPriceProvider()
+            _default_store = PriceStore(provider)
+        return _default_store
+
+
+def download(ticker, start, end):
+    """Drop-in replacement for `yf.download(ticker, start, end)` on the pages.
+
+    Frames are shared process-wide through the frame cache, so the dashboard
+    and the Charts page (and every session) reuse one copy per ticker and range.
+    """
+    store = default_store()
+    key = ("prices", store.provider.name, ticker.upper(), str(_day(start).date()), str(_day(end).date()))
+    ttl = OPEN_RANGE_TTL if _day(end) > _day(pd.Timestamp.today()) else None
+    return framecache.default_cache().get_or_compute(key, store.get, ticker, start, end, ttl=ttl)
@@ -0,0 +1,113 @@
+"""Process-wide benchmark and risk-free series shared by every session and page.
+
+The full history of each reference symbol is loaded once into memory and
+sliced per request. A daemon thread reloads it once per trading day, shortly
+after the U.S. close, so sessions never download ^GSPC or ^IRX themselves.
+"""
+import datetime
+import logging
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from stocksight import analytics, framecache, prices, singleflight
+
+BENCHMARK = "^GSPC"
+RISK_FREE = "^IRX"
+HISTORY_START = "1980-01-01"
+
+MARKET_TZ = ZoneInfo("America/New_York")
+REFRESH_AT = datetime.time(17, 30)
+
+
+def next_refresh(now):
+    """First weekday REFRESH_AT (New York time) strictly after `now`."""
+    now = now.astimezone(MARKET_TZ)
+    candidate = datetime.datetime.combine(now.date(), REFRESH_AT, MARKET_TZ)
+    if candidate <= now:
+        candidate += datetime.timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+class ReferenceStore:
+    def __init__(self, price_store=None, symbols=(BENCHMARK, RISK_FREE), history_start=HISTORY_START):
+        self.price_store = price_store or prices.default_store()
+        self.symbols = tuple(symbols)
+        self.history_start = history_start
+        self.refreshed_at = None
+        self._frames = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        frames = {s: self.price_store.get(s, self.history_start, end) for s in self.symbols}
+        with self._lock:
+            self._frames = frames
+            self.refreshed_at = datetime.datetime.now(MARKET_TZ)
+
+    def _loaded(self):
+        with self._lock:
+            return bool(self._frames)
+
+    def _load(self):
+        # checked again inside the flight: a caller may arrive just after another load finished
+        if not self._loaded():
+            self.refresh()
+
+    def _frame(self, symbol):
+        if not self._loaded():
+            # concurrent first requests (sessions, graph nodes) share one load
+            singleflight.group().do(("reference.load", id(self)), self._load)
+        with self._lock:
+            return self._frames[symbol]
+
+    def get(self, symbol, start, end):
+        """Daily bars for a reference symbol in [start, end) (a shared, read-only slice)."""
+        # keyed by the refresh time so slices of a superseded history are never served
+        refreshed_at = self.refreshed_at
+        frame = self._frame(symbol)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        key = ("reference", symbol, str(start.date()), str(end.date()), str(refreshed_at))
+        return framecache.default_cache().get_or_compute(
+            key, lambda: frame.loc[(frame.index >= start) & (frame.index < end)])
+
+    def benchmark(self, start, end):
+        return self.get(BENCHMARK, start, end)
+
+    def risk_free(self, start, end, periods=analytics.TRADING_DAYS):
+        """Annual and de-annualized daily risk-free rates from the 13-week T-bill."""
+        annual = self.get(RISK_FREE, start, end)["Adj Close"] / 100
+        return pd.DataFrame({"Annual_rfr": annual, "Daily_rfr": analytics.daily_from_annual(annual, periods)})
+
+    def _run_scheduler(self):
+        while True:
+            now = datetime.datetime.now(MARKET_TZ)
+            time.sleep(max((next_refresh(now) - now).total_seconds(), 0))
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"reference data refresh failed: {str(e)}")
+
+    def start_scheduler(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run_scheduler, daemon=True, name="reference-refresh")
+                self._thread.start()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ReferenceStore()
+            _default_store.start_scheduler()
+        return _default_store
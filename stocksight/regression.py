@@ -0,0 +1,111 @@
+"""Closed-form simple OLS (y = alpha + beta * x) for many series at once.
+
+Full-period and rolling fits both come from the same six sums (count, x,
+y, x*x, y*y, x*y), so statistics agree between the two and no statsmodels
+fit is needed. Rolling fits for any number of windows share one
+cumulative-sum pass; each extra window is O(T * N) differencing. `y` may
+be a (T, N) matrix sharing one regressor `x` (T,), or both may be (T, N).
+Rows where either side is NaN are left out of the sums.
+"""
+import numpy as np
+import pandas as pd
+
+from stocksight import analytics
+
+FIT_COLUMNS = ["alpha", "beta", "r_squared", "alpha_se", "beta_se", "resid_vol", "n"]
+
+DEFAULT_WINDOWS = (7, 21, 63, 252)
+
+
+def _as_2d(a):
+    a = np.asarray(a, dtype="float64")
+    return a[:, None] if a.ndim == 1 else a
+
+
+def _sums(y, x):
+    valid = ~(np.isnan(y) | np.isnan(x))
+    # centre on the overall means so differenced/rolling sums stay well conditioned
+    cx = np.nanmean(np.where(valid, x, np.nan), axis=0) if valid.any() else np.zeros(y.shape[1])
+    cy = np.nanmean(np.where(valid, y, np.nan), axis=0) if valid.any() else np.zeros(y.shape[1])
+    cx, cy = np.nan_to_num(cx), np.nan_to_num(cy)
+    xs = np.where(valid, x - cx, 0.0)
+    ys = np.where(valid, y - cy, 0.0)
+    return np.stack([valid.astype("float64"), xs, ys, xs * xs, ys * ys, xs * ys]), cx, cy
+
+
+def _fit(n, sx, sy, sxx, syy, sxy, cx, cy):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx, my = sx / n, sy / n
+        vxx = sxx - n * mx * mx
+        vyy = syy - n * my * my
+        vxy = sxy - n * mx * my
+        beta = vxy / vxx
+        ssr = np.maximum(vyy - beta * vxy, 0.0)
+        s2 = ssr / (n - 2)
+        mean_x = mx + cx
+        return {
+            "alpha": (my + cy) - beta * mean_x,
+            "beta": beta,
+            "r_squared": 1 - ssr / vyy,
+            "alpha_se": np.sqrt(s2 * (1 / n + mean_x ** 2 / vxx)),
+            "beta_se": np.sqrt(s2 / vxx),
+            "resid_vol": np.sqrt(s2),
+            "n": n,
+        }
+
+
+def _broadcast(y, x):
+    names = y.columns if isinstance(y, pd.DataFrame) else (
+        [y.name] if isinstance(y, pd.Series) else None)
+    index = y.index if isinstance(y, (pd.Series, pd.DataFrame)) else None
+    y2, x2 = _as_2d(y), _as_2d(x)
+    return y2, np.broadcast_to(x2, y2.shape), names, index
+
+
+def ols(y, x):
+    """Full-period fit per column of `y`; returns a DataFrame with FIT_COLUMNS."""
+    y2, x2, names, _ = _broadcast(y, x)
+    sums, cx, cy = _sums(y2, x2)
+    fit = _fit(*sums.sum(axis=1), cx, cy)
+    return pd.DataFrame(fit, index=names if names is not None else range(y2.shape[1]))[FIT_COLUMNS]
+
+
+def capm(stock, bench, rfr):
+    """Stock-vs-market fit on the dates where stock, benchmark and risk-free rate all exist.
+
+    Both sides are taken in excess of the average daily risk-free rate, so
+    beta is the same as `analytics.compute_metrics` and the intercept is its
+    Jensen's alpha. Returns one row with FIT_COLUMNS.
+    """
+    frame, b, f = analytics.align(stock.rename("stock"), bench, rfr)
+    r = frame["stock"].to_numpy(dtype="float64")
+    keep = ~(np.isnan(r) | np.isnan(b) | np.isnan(f))
+    mean_f = f[keep].mean() if keep.any() else 0.0
+    return ols(r[keep] - mean_f, b[keep] - mean_f).iloc[0]
+
+
+def rolling_ols(y, x, windows=DEFAULT_WINDOWS):
+    """Rolling fits for every window; returns {window: {column: (T, N) array or DataFrame}}.
+
+    A window containing any NaN yields NaN, like pandas with min_periods=window.
+    Windows of two rows or fewer (no residual degrees of freedom) are all NaN.
+    """
+    y2, x2, names, index = _broadcast(y, x)
+    sums, cx, cy = _sums(y2, x2)
+    prefix = np.zeros((sums.shape[0], sums.shape[1] + 1, sums.shape[2]))
+    np.cumsum(sums, axis=1, out=prefix[:, 1:])
+    T = y2.shape[0]
+    cols = names if names is not None else range(y2.shape[1])
+    results = {}
+    for window in sorted(set(int(w) for w in windows)):
+        out = {c: np.full(y2.shape, np.nan) for c in FIT_COLUMNS}
+        if 2 < window <= T:
+            win = prefix[:, window:] - prefix[:, :-window]
+            fit = _fit(*win, cx, cy)
+            full = win[0] == window
+            for c in FIT_COLUMNS:
+                out[c][window - 1:] = np.where(full, fit[c], np.nan)
+        if index is not None:
+            out = {c: pd.DataFrame(v, index=index, columns=cols) for c, v in out.items()}
+        results[window] = out
+    return results
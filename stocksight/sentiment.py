@@ -0,0 +1,134 @@
+"""VADER compound scores with a persistent per-headline cache.
+
+Scores are keyed by a hash of the headline text and kept in SQLite, so a
+headline is scored once no matter how many sessions or tickers show it.
+The most recent MEMORY_ENTRIES scores are also held in memory (LRU). One
+analyzer is shared per process. Large batches of unseen headlines are split
+across the shared worker pool (VADER is pure Python, so threads would not
+help); smaller ones are scored in-process.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from stocksight import instrument, workers
+from stocksight.prices import CACHE_DIR
+
+POOL_THRESHOLD = 500
+CHUNK_SIZE = 250
+MEMORY_ENTRIES = 50_000
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def has_vader_lexicon():
+    """Whether the VADER lexicon is installed locally (never downloads)."""
+    import nltk
+
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        return False
+    return True
+
+
+def ensure_vader_lexicon():
+    import nltk
+
+    if not has_vader_lexicon():
+        nltk.download("vader_lexicon")
+
+
+def analyzer():
+    """The process-wide analyzer; the lexicon check runs once, when it is first built."""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+            ensure_vader_lexicon()
+            _analyzer = SentimentIntensityAnalyzer()
+        return _analyzer
+
+
+def score_titles(titles):
+    """Compound scores without caching; also the process-pool work unit."""
+    vader = analyzer()
+    return [vader.polarity_scores(title)["compound"] for title in titles]
+
+
+def headline_key(title):
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+
+class SentimentService:
+    def __init__(self, path=os.path.join(CACHE_DIR, "sentiment.sqlite"), workers=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.workers = workers
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, compound REAL)")
+        self._memory = OrderedDict()      # headline key -> score, least recently used first
+        self._lock = threading.Lock()
+
+    def _lookup(self, keys):
+        found = {}
+        for k in keys:
+            if k in self._memory:
+                self._memory.move_to_end(k)
+                found[k] = self._memory[k]
+        missing = [k for k in keys if k not in found]
+        # stay well under SQLite's bound-parameter limit
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            rows = self._db.execute(
+                f"SELECT key, compound FROM scores WHERE key IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            found.update(rows)
+        return found
+
+    def _score_new(self, titles):
+        if len(titles) < POOL_THRESHOLD:
+            return score_titles(titles)
+        chunks = [titles[i:i + CHUNK_SIZE] for i in range(0, len(titles), CHUNK_SIZE)]
+        return [s for chunk in workers.map(score_titles, chunks, max_workers=self.workers) for s in chunk]
+
+    def _remember(self, scores):
+        self._memory.update(scores)
+        for k in scores:
+            self._memory.move_to_end(k)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def score(self, titles):
+        """Compound score for each title, scoring only headlines never seen before."""
+        titles = list(titles)
+        keys = [headline_key(t) for t in titles]
+        with self._lock:
+            known = self._lookup(list(dict.fromkeys(keys)))
+        new = {k: t for k, t in zip(keys, titles) if k not in known}
+        instrument.count("sentiment", hit=True, n=len(known))
+        instrument.count("sentiment", hit=False, n=len(new))
+        if new:
+            with instrument.span("compute", "vader.score", headlines=len(new)):
+                scores = dict(zip(new, self._score_new(list(new.values()))))
+            with self._lock:
+                self._db.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", scores.items())
+                self._db.commit()
+            known.update(scores)
+        with self._lock:
+            self._remember(known)
+        return [known[k] for k in keys]
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def default_service():
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = SentimentService()
+        return _default_service
@@ -0,0 +1,69 @@
+"""Single-flight coalescing of identical upstream calls.
+
+When several sessions ask for the same thing at the same time, the first
+caller runs the fetch and the rest wait for it and share its result (or its
+exception). Nothing is cached once the call completes; caching is left to the
+stores in front of this layer.
+"""
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0   # calls answered by someone else's fetch
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+_group = SingleFlight()
+
+
+def group():
+    """Process-wide group shared by every upstream client."""
+    return _group
+
+
+def coalesce(namespace):
+    """Decorator: concurrent calls with equal arguments share one execution.
+
+    Arguments must be hashable; they become part of the flight key together
+    with `namespace`.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (namespace, args, tuple(sorted(kwargs.items())))
+            return _group.do(key, fn, *args, **kwargs)
+        return wrapper
+    return wrap
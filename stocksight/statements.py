@@ -0,0 +1,192 @@
+"""Local store for Alpha Vantage financial statements with daily quota tracking.
+
+Statements only change quarterly, so anything already on disk is served
+straight away and only refreshed once it is older than `max_age` and the
+daily request quota allows it. Spare quota can be spent prefetching a
+watchlist from a background thread.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from stocksight import instrument, prices, singleflight
+from stocksight.prices import CACHE_DIR
+
+STATEMENT_METHODS = {
+    ("balance_sheet", "annual"): "get_balance_sheet_annual",
+    ("balance_sheet", "quarterly"): "get_balance_sheet_quarterly",
+    ("income_statement", "annual"): "get_income_statement_annual",
+    ("income_statement", "quarterly"): "get_income_statement_quarterly",
+    ("cash_flow", "annual"): "get_cash_flow_annual",
+    ("cash_flow", "quarterly"): "get_cash_flow_quarterly",
+}
+
+DAILY_LIMIT = 25
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class QuotaTracker:
+    """Persisted count of upstream requests made today (UTC)."""
+
+    def __init__(self, path, daily_limit=DAILY_LIMIT):
+        self.path = path
+        self.daily_limit = daily_limit
+        self._lock = threading.Lock()
+
+    def _today(self):
+        return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("date") != self._today():
+            state = {"date": self._today(), "used": 0}
+        return state
+
+    def remaining(self):
+        with self._lock:
+            return max(self.daily_limit - self._read()["used"], 0)
+
+    def consume(self):
+        """Reserve one request, raising QuotaExceeded when none are left."""
+        with self._lock:
+            state = self._read()
+            if state["used"] >= self.daily_limit:
+                raise QuotaExceeded(f"daily API request limit ({self.daily_limit}) exceeded")
+            state["used"] += 1
+            self._write(state)
+
+    def exhaust(self):
+        # upstream told us we are out, whatever our own count says
+        with self._lock:
+            state = self._read()
+            state["used"] = self.daily_limit
+            self._write(state)
+
+    def _write(self, state):
+        prices._replace(self.path, lambda tmp: prices._write_json(tmp, state))
+
+
+class StatementStore:
+    """Statements keyed by ticker/statement/period, stored as Parquet."""
+
+    def __init__(self, api_key, root=CACHE_DIR, daily_limit=DAILY_LIMIT,
+                 max_age=datetime.timedelta(days=7), client=None):
+        self.root = os.path.join(root, "statements")
+        os.makedirs(self.root, exist_ok=True)
+        self.quota = QuotaTracker(os.path.join(self.root, "quota.json"), daily_limit)
+        self.max_age = max_age
+        self._api_key = api_key
+        self._client = client
+        self._lock = threading.Lock()
+        self._prefetch_thread = None
+
+    def client(self):
+        if self._client is None:
+            from alpha_vantage.fundamentaldata import FundamentalData
+
+            self._client = FundamentalData(self._api_key, output_format="pandas")
+        return self._client
+
+    def _path(self, ticker, statement, period):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker.upper())
+        return os.path.join(self.root, safe, f"{statement}_{period}.parquet")
+
+    def cached(self, ticker, statement, period):
+        path = self._path(ticker, statement, period)
+        if not os.path.exists(path):
+            return None, None
+        age = datetime.timedelta(seconds=time.time() - os.path.getmtime(path))
+        return pd.read_parquet(path), age
+
+    def _fetch(self, ticker, statement, period):
+        # a statement already being fetched for another session is waited on, not re-requested
+        key = ("alphavantage", ticker.upper(), statement, period)
+        return singleflight.group().do(key, self._fetch_now, ticker, statement, period)
+
+    def _fetch_now(self, ticker, statement, period):
+        method = getattr(self.client(), STATEMENT_METHODS[(statement, period)])
+        self.quota.consume()
+        try:
+            with instrument.span("fetch", "alphavantage.statement", ticker=ticker, statement=statement, period=period):
+                data = method(ticker)[0]
+        except ValueError as e:
+            if "limit" in str(e).lower() or "rate" in str(e).lower():
+                self.quota.exhaust()
+                raise QuotaExceeded(str(e)) from e
+            raise
+        path = self._path(ticker, statement, period)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        prices._replace(path, data.to_parquet)
+        return data
+
+    def needs_refresh(self, ticker, statement, period):
+        path = self._path(ticker, statement, period)
+        if not os.path.exists(path):
+            return True
+        return time.time() - os.path.getmtime(path) > self.max_age.total_seconds()
+
+    def get(self, ticker, statement, period):
+        """Cached statement, refreshed only when stale and quota allows."""
+        data, age = self.cached(ticker, statement, period)
+        if data is not None and (age <= self.max_age or self.quota.remaining() == 0):
+            instrument.count("statements", hit=True)
+            return data
+        instrument.count("statements", hit=False)
+        try:
+            return self._fetch(ticker, statement, period)
+        except QuotaExceeded:
+            if data is not None:
+                return data
+            raise
+
+    def prefetch(self, watchlist, reserve=5):
+        """Fetch missing or stale statements while more than `reserve` requests remain."""
+        for ticker in watchlist:
+            for statement, period in STATEMENT_METHODS:
+                if self.quota.remaining() <= reserve:
+                    return
+                if not self.needs_refresh(ticker, statement, period):
+                    continue
+                try:
+                    self._fetch(ticker, statement, period)
+                except QuotaExceeded:
+                    return
+                except Exception as e:
+                    logging.error(f"error prefetching {statement} ({period}) for {ticker}: {str(e)}")
+
+    def start_prefetch(self, watchlist, reserve=5):
+        """Run `prefetch` on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+                return
+            self._prefetch_thread = threading.Thread(
+                target=self.prefetch, args=(list(watchlist), reserve), daemon=True)
+            self._prefetch_thread.start()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store(api_key):
+    """Process-wide store; tickers in STOCKSIGHT_WATCHLIST are prefetched on creation."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = StatementStore(api_key)
+            watchlist = [t.strip() for t in os.environ.get("STOCKSIGHT_WATCHLIST", "").split(",") if t.strip()]
+            if watchlist:
+                _default_store.start_prefetch(watchlist)
+        return _default_store
@@ -0,0 +1,51 @@
+"""Paginated table rendering for long frames.
+
+Only the visible page is sliced out, styled and sent to the browser, and the
+green/red colouring is computed for the whole page in one vectorized call
+instead of a Python function per cell.
+"""
+import math
+
+import numpy as np
+
+from stocksight import instrument
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+
+def sign_colors(values, positive="green", negative="red"):
+    """CSS colour per value: `positive` for >= 0, `negative` otherwise (NaN gets none)."""
+    values = np.asarray(values, dtype="float64")
+    return np.where(np.isnan(values), "", np.where(values >= 0, f"color: {positive}", f"color: {negative}"))
+
+
+def page_count(n_rows, page_size):
+    return max(math.ceil(n_rows / page_size), 1)
+
+
+def page_slice(frame, page, page_size):
+    """Rows of 1-based `page`; out-of-range pages are clamped."""
+    page = min(max(page, 1), page_count(len(frame), page_size))
+    return frame.iloc[(page - 1) * page_size:page * page_size]
+
+
+def paged_table(frame, color_columns=(), key="table", page_sizes=PAGE_SIZES):
+    """Show `frame` one page at a time with sign-coloured `color_columns`."""
+    import streamlit as st
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    page_size = col1.selectbox("Rows per page", options=page_sizes, index=1, key=f"{key}_page_size")
+    pages = page_count(len(frame), page_size)
+    # start on the latest rows, and clamp when a shorter frame leaves the old page out of range
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, pages) > pages or page_key not in st.session_state:
+        st.session_state[page_key] = pages
+    page = col2.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    col3.caption(f"{len(frame):,} rows, page {page} of {pages}")
+
+    visible = page_slice(frame, page, page_size)
+    styled = visible.style
+    if color_columns:
+        styled = styled.apply(lambda col: sign_colors(col.to_numpy()), subset=list(color_columns))
+    with instrument.span("render", f"{key}_page"):
+        st.dataframe(styled)
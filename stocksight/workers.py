@@ -0,0 +1,44 @@
+"""Process pool shared by the CPU-bound scorers (VADER, the bootstrap).
+
+The pool is created on first use and kept for the life of the process, so a
+Streamlit server does not start and tear down worker processes on every
+call. If a worker dies, the pool breaks; it is then replaced and the work is
+retried once.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_pool = None
+_lock = threading.Lock()
+
+
+def pool(max_workers=None):
+    """The process-wide pool; `max_workers` (or STOCKSIGHT_WORKERS) applies when it is first created."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            if max_workers is None and os.environ.get("STOCKSIGHT_WORKERS"):
+                max_workers = int(os.environ["STOCKSIGHT_WORKERS"])
+            _pool = ProcessPoolExecutor(max_workers=max_workers)
+        return _pool
+
+
+def _discard(broken):
+    global _pool
+    with _lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def map(fn, *iterables, max_workers=None):
+    """`list(pool().map(fn, *iterables))`, retried once on a fresh pool if the pool has broken."""
+    iterables = [list(it) for it in iterables]
+    executor = pool(max_workers)
+    try:
+        return list(executor.map(fn, *iterables))
+    except BrokenProcessPool:
+        _discard(executor)
+        return list(pool(max_workers).map(fn, *iterables))